@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+from generate_export import generate_export
+
+# Regression check that the builder's output stays byte-identical.
+#
+# Builds the example export and a small generated workbook with a fixed firmVer in every
+# output mode (plain, parallel, incremental with and without a warm cache, sharded) and
+# compares each result with the XML stored under benchmarks/expected/. The expected files
+# were produced by the original builder, so any difference is a change in output, not
+# just in speed. Run it before and after touching anything that produces XML:
+#
+#   python benchmarks/check_output.py
+#
+# Only if the output is meant to change, regenerate the expected files with --update and
+# review their diff.
+
+EXPECTED_DIR = os.path.join(BENCHMARK_DIR, "expected")
+FIRM_VER = "CHECK"
+
+# Generated workbook: both interfaces, several flow types, disabled flows, enabled flows with an empty
+# address and other device types to filter out
+GENERATED_EXPORT = {'devices': 20, 'spigots': 4, 'dest_spigots': 6, 'flows_per_spigot': 6, 'other_devices': 5,
+                    'empty_address_ratio': 0.05, 'seed': 20240613}
+
+# Builder options of every mode, the incremental mode runs twice so the second build comes from the cache
+MODES = {
+    'plain': [[]],
+    'parallel': [["-j", "2"]],
+    'incremental': [["-i"], ["-i"]],
+    'sharded': [["--shard-devices", "7", "-j", "2"]],
+}
+
+# Function to run the command line builder, returns the XML it produced as bytes
+def build(workbook, out_path, runs):
+    for options in runs:
+        command = [sys.executable, os.path.join(REPO_DIR, "dds_builder.py"), workbook, "-o", out_path,
+                   "--firm-ver", FIRM_VER, "--log-level", "ERROR", *options]
+        # The builder log goes to the temporary directory instead of the checkout
+        subprocess.run(command, cwd=os.path.dirname(out_path), check=True)
+
+    if "--shard-devices" in runs[-1]:
+        with open(out_path + ".manifest.json", "r", encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+        parts = []
+        for shard in manifest['shards']:
+            with open(os.path.join(os.path.dirname(out_path), shard['file']), "rb") as shard_file:
+                parts.append(shard_file.read())
+        return b"\n".join(parts)
+
+    with open(out_path, "rb") as xml_file:
+        return xml_file.read()
+
+def first_difference(expected, actual):
+    for number, (expected_line, actual_line) in enumerate(zip(expected.split(b"\n"), actual.split(b"\n")), start=1):
+        if expected_line != actual_line:
+            position = next(i for i, (a, b) in enumerate(zip(expected_line + b"\0", actual_line + b"\1")) if a != b)
+            return f"device {number}, byte {position}: expected {expected_line[position:position + 60]!r}, got {actual_line[position:position + 60]!r}"
+    expected_devices, actual_devices = len(expected.split(b"\n")), len(actual.split(b"\n"))
+    return f"expected {expected_devices} devices, got {actual_devices}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that the builder's XML output is unchanged in every mode.")
+    parser.add_argument("--update", action="store_true", help="overwrite the expected XML with the current plain output")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as temp_dir:
+        generated = os.path.join(temp_dir, "generated.xlsx")
+        generate_export(generated, **GENERATED_EXPORT)
+        cases = {
+            'example': os.path.join(REPO_DIR, "examples", "export-spreadsheets", "export-dds-20240613.xlsx"),
+            'generated': generated,
+        }
+
+        for case, workbook in cases.items():
+            expected_path = os.path.join(EXPECTED_DIR, f"{case}.xml")
+            if args.update:
+                os.makedirs(EXPECTED_DIR, exist_ok=True)
+                with open(expected_path, "wb") as expected_file:
+                    expected_file.write(build(workbook, os.path.join(temp_dir, "update.xml"), MODES['plain']))
+                print(f"Updated {expected_path}")
+                continue
+
+            with open(expected_path, "rb") as expected_file:
+                expected = expected_file.read()
+            for mode, runs in MODES.items():
+                mode_dir = os.path.join(temp_dir, f"{case}-{mode}")
+                os.makedirs(mode_dir)
+                actual = build(workbook, os.path.join(mode_dir, "DummyDevices.xml"), runs)
+                if actual == expected:
+                    print(f"  same  {case:<10} {mode}")
+                else:
+                    failures += 1
+                    print(f"  DIFF  {case:<10} {mode}: {first_difference(expected, actual)}")
+                shutil.rmtree(mode_dir)
+
+    if failures:
+        print(f"{failures} outputs differ from {EXPECTED_DIR}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from urllib.parse import urlsplit
+
+# Load-test client for dds_emulator.py.
+#
+# Opens a number of keep-alive connections to the emulator and has each of them request
+# random devices back to back for a fixed duration. Reports requests per second and the
+# latency distribution, and optionally saves the result as JSON.
+#
+#   python dds_emulator.py DummyDevices.xml &
+#   python benchmarks/emulator_load_test.py --url http://127.0.0.1:8080 --connections 50 --duration 10
+
+# Function to send one GET on an open connection, returns (status, body)
+async def get(reader, writer, host, path):
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("ascii"))
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    body = await reader.readexactly(length)
+    return status, body
+
+async def worker(host, port, paths, deadline, latencies, errors, rng):
+    reader, writer = await asyncio.open_connection(host, port, limit=16 * 1024 * 1024)
+    try:
+        while time.perf_counter() < deadline:
+            path = rng.choice(paths)
+            start = time.perf_counter()
+            status, _ = await get(reader, writer, host, path)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+async def run_load_test(url, connections, duration, seed):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+
+    # The device list decides which paths are requested
+    reader, writer = await asyncio.open_connection(host, port, limit=64 * 1024 * 1024)
+    status, body = await get(reader, writer, host, "/devices")
+    writer.close()
+    if status != 200:
+        raise RuntimeError(f"GET /devices returned {status}")
+    guids = [device["guid"] for device in json.loads(body)]
+    if not guids:
+        raise RuntimeError("The emulator serves no devices")
+    paths = [f"/devices/{guid}" for guid in guids]
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(worker(host, port, paths, deadline, latencies, errors, random.Random(seed + n))
+                           for n in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    def percentile(fraction):
+        return 1000 * latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+    return {
+        'url': url,
+        'devices': len(guids),
+        'connections': connections,
+        'seconds': elapsed,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'requests_per_second': len(latencies) / elapsed,
+        'latency_ms': {
+            'mean': 1000 * statistics.fmean(latencies),
+            'p50': percentile(0.50),
+            'p95': percentile(0.95),
+            'p99': percentile(0.99),
+            'max': 1000 * latencies[-1],
+        } if latencies else None,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure request throughput and latency of dds_emulator.py.")
+    parser.add_argument("--url", default="http://127.0.0.1:8080", help="emulator address (default: %(default)s)")
+    parser.add_argument("-c", "--connections", type=int, default=50, help="concurrent keep-alive connections (default: %(default)s)")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="seconds to run (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=1, help="random seed (default: %(default)s)")
+    parser.add_argument("--json", metavar="PATH", help="also save the result as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        result = asyncio.run(run_load_test(args.url, args.connections, args.duration, args.seed))
+    except (OSError, RuntimeError, asyncio.IncompleteReadError) as e:
+        print(f"Load test failed: {e}", file=sys.stderr)
+        return 1
+
+    print(f"{result['requests']} requests to {result['devices']} devices over {result['connections']} connections "
+          f"in {result['seconds']:.1f}s, {result['errors']} errors")
+    print(f"  throughput {result['requests_per_second']:10.0f} req/s")
+    if result['latency_ms'] is not None:
+        for name, value in result['latency_ms'].items():
+            print(f"  {name:<10} {value:10.2f} ms")
+    if args.json:
+        with open(args.json, "w") as result_file:
+            json.dump(result, result_file, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import argparse
+import logging
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dds_builder import ExportData, create_flow_elements, flow_type_replacements
+
+# Per-flow cost of building Flow_A/Flow_B elements for every source spigot, comparing the
+# original DataFrame.iterrows() construction with the column-prepared flow records.
+#
+#   python benchmarks/flow_construction.py --flows 100000
+
+FLOW_TYPES = ["ST 2110-20", "ST 2110-30", "ST 2110-30", "ST 2110-40", "ST 2022-6", "meta"]
+
+# Function to build an in-memory Source Flows table shaped like an IP Configurator export
+def synthetic_flows(num_flows, spigots_per_device=8, flows_per_spigot=12):
+    rows = []
+    for n in range(num_flows):
+        device, rest = divmod(n, spigots_per_device * flows_per_spigot)
+        spigot, flow = divmod(rest, flows_per_spigot)
+        port = 50000 + flow * 2
+        rows.append({
+            'GUID': f"{{{device:08X}-1DD2-11B2-0000-000000000000}}",
+            'Device Type': 'GVOP',
+            'Interface': 'A' if flow % 2 == 0 else 'B',
+            'Flow Type': FLOW_TYPES[flow % len(FLOW_TYPES)],
+            'Spigot Index': spigot + 1,
+            'Flow Enabled': True,
+            'Multicast Address': f"239.{device % 250}.{spigot}.{flow}",
+            'Source Address': f"10.{device // 250 % 250}.{device % 250}.1",
+            'Dst RTP Port': float(port),
+            'Src RTP Port': float(port) if flow % 5 else float('nan'),
+        })
+    return pd.DataFrame(rows)
+
+# The construction loop as it was before the flow records were prepared column-wise
+def legacy_create_flow_elements(parent, spigot_flows):
+    flow_a_index = 0
+    flow_b_index = 0
+    for _, flow_row in spigot_flows.iterrows():
+        interface = flow_row['Interface']
+        flow_type = flow_row['Flow Type']
+        flow_type = flow_type_replacements.get(flow_type, flow_type)
+        mcast_address = flow_row['Multicast Address']
+        src_address = flow_row['Source Address']
+        dst_port = int(flow_row['Dst RTP Port'])
+        src_port = int(flow_row['Src RTP Port']) if pd.notnull(flow_row['Src RTP Port']) else dst_port
+        params_type = "metadata" if flow_type == "meta" else flow_type
+        if interface == "A":
+            flow_element = ET.SubElement(parent, "Flow_A")
+            flow_element.set("idx", str(flow_a_index))
+            flow_a_index += 1
+        else:
+            flow_element = ET.SubElement(parent, "Flow_B")
+            flow_element.set("idx", str(flow_b_index))
+            flow_b_index += 1
+        caps_element = ET.SubElement(flow_element, "Caps")
+        caps_element.set(flow_type, "1")
+        params_element = ET.SubElement(flow_element, "Params")
+        params_element.set("mcastAddress", str(mcast_address))
+        params_element.set("srcAddress", str(src_address))
+        params_element.set("dstPort", str(dst_port))
+        params_element.set("srcPort", str(src_port))
+        params_element.set("type", str(params_type))
+
+def bench_legacy(flows):
+    groups = {key: rows for key, rows in flows.groupby(['GUID', 'Spigot Index'], sort=False)}
+    start = time.perf_counter()
+    for spigot_flows in groups.values():
+        legacy_create_flow_elements(ET.Element("Spigot"), spigot_flows)
+    return time.perf_counter() - start
+
+def bench_current(flows):
+    spigots = flows[['GUID', 'Device Type', 'Spigot Index']].drop_duplicates()
+    device_names = pd.DataFrame({'GUID': spigots['GUID'].unique(), 'Device Name': 'DEV', 'Device Type': 'GVOP', 'IP Address': '10.0.0.1'})
+    start = time.perf_counter()
+    data = ExportData(device_names, spigots, spigots.iloc[0:0], flows)
+    prepare_time = time.perf_counter() - start
+    for device in data.devices:
+        for spigot in device.source_spigots:
+            create_flow_elements(ET.Element("Spigot"), device.guid, spigot, is_source_spigot=True)
+    return time.perf_counter() - start, prepare_time
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare iterrows() and column-prepared construction of Flow_A/Flow_B elements.")
+    parser.add_argument("--flows", type=int, default=100000, help="number of synthetic flows (default: %(default)s)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    flows = synthetic_flows(args.flows)
+
+    legacy = bench_legacy(flows)
+    current, prepare = bench_current(flows)
+
+    print(f"flows:   {len(flows)}")
+    print(f"before:  {legacy:8.3f}s  {legacy / len(flows) * 1e6:8.2f} us/flow  (iterrows)")
+    print(f"after:   {current:8.3f}s  {current / len(flows) * 1e6:8.2f} us/flow  (includes {prepare:.3f}s column preparation)")
+    print(f"speedup: {legacy / current:8.1f}x")
+
+if __name__ == '__main__':
+    main()
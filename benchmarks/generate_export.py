@@ -0,0 +1,122 @@
+import argparse
+import random
+
+import openpyxl
+
+# Synthetic IP Configurator export generator for benchmarks.
+#
+# Writes a workbook with the four sheets the builder reads (Device Names, Source Ports,
+# Destination Ports, Source Flows) using the same columns and cell conventions as a real
+# export, e.g. Flow Enabled as 'TRUE'/'FALSE' text and empty Sender columns.
+#
+#   python benchmarks/generate_export.py export-large.xlsx --devices 2000 --spigots 8 --flows-per-spigot 12
+
+DEVICE_COLUMNS = ['GUID', 'IP Address', 'Device Name', 'Device Type', 'Short Name', 'Host Name', 'Description']
+PORT_COLUMNS = ['GUID', 'IP Address', 'Device Name', 'Device Type', 'External ID', 'Port Name', 'Short Name',
+                'Spigot Index', 'Group Name']
+FLOW_COLUMNS = ['GUID', 'IP Address', 'Device Name', 'Device Type', 'Interface', 'Flow Type', 'Type Index',
+                'Spigot Index', 'Flow Enabled', 'Multicast Address', 'Source Address', 'Dst RTP Port', 'Src RTP Port',
+                'Sender Id', 'Group Name', 'Sender Label', 'Sender Description']
+
+DEFAULT_INTERFACE_MIX = "A:1,B:1"
+DEFAULT_FLOW_TYPE_MIX = "ST 2110-20:1,ST 2110-30:4,ST 2110-40:1"
+FLOW_TYPE_PORTS = {"ST 2110-20": 50100, "ST 2110-30": 50104, "ST 2110-40": 50102, "ST 2022-6": 50106}
+
+def parse_mix(text):
+    # "A:1,B:3" -> (['A', 'B'], [1.0, 3.0])
+    names, weights = [], []
+    for part in text.split(','):
+        name, _, weight = part.rpartition(':')
+        names.append(name.strip())
+        weights.append(float(weight))
+    return names, weights
+
+# Function to write a synthetic export workbook, returns the number of rows written per sheet
+def generate_export(path, devices=100, spigots=8, dest_spigots=8, flows_per_spigot=12,
+                    interface_mix=DEFAULT_INTERFACE_MIX, flow_type_mix=DEFAULT_FLOW_TYPE_MIX,
+                    disabled_ratio=0.05, other_devices=0, device_type="GVOP", seed=1, empty_address_ratio=0.0):
+    rng = random.Random(seed)
+    interfaces, interface_weights = parse_mix(interface_mix)
+    flow_types, flow_type_weights = parse_mix(flow_type_mix)
+
+    # Write-only mode streams rows to disk, so large workbooks don't build cell objects in memory
+    workbook = openpyxl.Workbook(write_only=True)
+    device_sheet = workbook.create_sheet('Device Names')
+    source_sheet = workbook.create_sheet('Source Ports')
+    destination_sheet = workbook.create_sheet('Destination Ports')
+    flow_sheet = workbook.create_sheet('Source Flows')
+    device_sheet.append(DEVICE_COLUMNS)
+    source_sheet.append(PORT_COLUMNS)
+    destination_sheet.append(PORT_COLUMNS)
+    flow_sheet.append(FLOW_COLUMNS)
+
+    # Other device types are interleaved so the builder's filtering has work to do
+    device_types = [device_type] * devices + ["OTHER"] * other_devices
+    rng.shuffle(device_types)
+
+    counts = {'Device Names': 0, 'Source Ports': 0, 'Destination Ports': 0, 'Source Flows': 0}
+    for number, this_type in enumerate(device_types):
+        guid = "{%08X-1DD2-11B2-%04X-%012X}" % (number, rng.randrange(0x10000), number)
+        ip_a = f"10.{1 + number // 62500 % 100}.{number // 250 % 250}.{number % 250 + 1}"
+        ip_b = f"10.{101 + number // 62500 % 100}.{number // 250 % 250}.{number % 250 + 1}"
+        name = f"DEV{number:06d}"
+        device_sheet.append([guid, ip_a, name, this_type, None, None, None])
+        counts['Device Names'] += 1
+
+        for spigot in range(1, spigots + 1):
+            source_sheet.append([guid, ip_a, name, this_type, spigot, f"{name}-{spigot}", f"Spigot {spigot}", spigot, None])
+            counts['Source Ports'] += 1
+
+            type_index = {}
+            for flow in range(flows_per_spigot):
+                interface = rng.choices(interfaces, interface_weights)[0]
+                flow_type = rng.choices(flow_types, flow_type_weights)[0]
+                type_index[flow_type] = type_index.get(flow_type, 0) + 1
+                enabled = rng.random() >= disabled_ratio
+                port = FLOW_TYPE_PORTS.get(flow_type, 50110)
+                source_address = ip_a if interface == "A" else ip_b
+                mcast = f"239.{number // 250 % 250}.{number % 250}.{(spigot * flows_per_spigot + flow) % 256}"
+                # Enabled flows with an empty Multicast or Source Address, as a half-configured export has
+                if enabled and empty_address_ratio and rng.random() < empty_address_ratio:
+                    if rng.random() < 0.5:
+                        mcast = None
+                    else:
+                        source_address = None
+                flow_sheet.append([guid, ip_a, name, this_type, interface, flow_type, type_index[flow_type], spigot,
+                                   "TRUE" if enabled else "FALSE",
+                                   mcast if enabled else None, source_address if enabled else None,
+                                   port if enabled else None, port if enabled else None,
+                                   None, None, None, None])
+                counts['Source Flows'] += 1
+
+        for spigot in range(spigots + 1, spigots + dest_spigots + 1):
+            destination_sheet.append([guid, ip_a, name, this_type, None, None, None, spigot, None])
+            counts['Destination Ports'] += 1
+
+    workbook.save(path)
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic IP Configurator export workbook.")
+    parser.add_argument("output", help="path of the .xlsx file to write")
+    parser.add_argument("--devices", type=int, default=100, help="devices of the exported type (default: %(default)s)")
+    parser.add_argument("--spigots", type=int, default=8, help="source spigots per device (default: %(default)s)")
+    parser.add_argument("--dest-spigots", type=int, default=8, help="destination spigots per device (default: %(default)s)")
+    parser.add_argument("--flows-per-spigot", type=int, default=12, help="flows per source spigot (default: %(default)s)")
+    parser.add_argument("--interface-mix", default=DEFAULT_INTERFACE_MIX, help="interface weights (default: %(default)s)")
+    parser.add_argument("--flow-type-mix", default=DEFAULT_FLOW_TYPE_MIX, help="Flow Type weights (default: %(default)s)")
+    parser.add_argument("--disabled-ratio", type=float, default=0.05, help="share of disabled flows (default: %(default)s)")
+    parser.add_argument("--other-devices", type=int, default=0, help="extra devices of another type to filter out (default: %(default)s)")
+    parser.add_argument("--device-type", default="GVOP", help="Device Type of the generated devices (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=1, help="random seed (default: %(default)s)")
+    parser.add_argument("--empty-address-ratio", type=float, default=0.0,
+                        help="share of enabled flows with an empty Multicast or Source Address (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    counts = generate_export(args.output, args.devices, args.spigots, args.dest_spigots, args.flows_per_spigot,
+                             args.interface_mix, args.flow_type_mix, args.disabled_ratio, args.other_devices,
+                             args.device_type, args.seed, args.empty_address_ratio)
+    print(f"Wrote {args.output}: " + ", ".join(f"{name}={count}" for name, count in counts.items()))
+
+if __name__ == '__main__':
+    main()
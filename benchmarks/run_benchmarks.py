@@ -0,0 +1,147 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import pandas as pd
+
+from dds_builder import load_export, iter_device_elements, process_and_create_xml, write_device_elements
+from generate_export import generate_export
+
+# Benchmark harness for the config builder.
+#
+# Times workbook ingestion, XML generation and the file write as separate phases, plus an
+# end-to-end process_and_create_xml run, and records the peak RSS of the process. Every run
+# is saved as a JSON file under benchmarks/results/ so results can be compared across releases.
+#
+#   python benchmarks/run_benchmarks.py --devices 2000
+#   python benchmarks/run_benchmarks.py --workbook examples/export-spreadsheets/export-dds-20240613.xlsx
+
+DEFAULT_RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+# Function to read the peak resident set size of this process in MB, None where unsupported
+def peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)  # Windows
+    except (ImportError, AttributeError):
+        return None
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARK_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Function to time each phase once, returns a dict of seconds and the peak RSS after each phase
+def run_once(workbook, output, engine, workers):
+    phases = {}
+
+    start = time.perf_counter()
+    data = load_export(workbook, engine=engine, snapshot=False)  # Always time the workbook parse, not a snapshot load
+    phases['ingest_s'] = time.perf_counter() - start
+    phases['ingest_peak_rss_mb'] = peak_rss_mb()
+
+    start = time.perf_counter()
+    fragments = [ET.tostring(device, encoding='unicode') for device in iter_device_elements(data)]
+    phases['generate_s'] = time.perf_counter() - start
+    phases['generate_peak_rss_mb'] = peak_rss_mb()
+
+    start = time.perf_counter()
+    with open(output, "w", encoding="utf-8") as xml_file:
+        write_device_elements(xml_file, fragments)
+    phases['write_s'] = time.perf_counter() - start
+    del fragments
+
+    start = time.perf_counter()
+    process_and_create_xml(data, output, workers)
+    phases['end_to_end_s'] = time.perf_counter() - start
+    phases['peak_rss_mb'] = peak_rss_mb()
+
+    phases['devices'] = len(data.devices)
+    phases['source_flows'] = sum(len(spigot.flows) for device in data.devices for spigot in device.source_spigots)
+    phases['output_bytes'] = os.path.getsize(output)
+    return phases
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time ingestion, XML generation and write of the config builder.")
+    parser.add_argument("--workbook", help="existing export to benchmark (default: generate one from the options below)")
+    parser.add_argument("--devices", type=int, default=500, help="generated devices (default: %(default)s)")
+    parser.add_argument("--spigots", type=int, default=8, help="generated source spigots per device (default: %(default)s)")
+    parser.add_argument("--dest-spigots", type=int, default=8, help="generated destination spigots per device (default: %(default)s)")
+    parser.add_argument("--flows-per-spigot", type=int, default=12, help="generated flows per spigot (default: %(default)s)")
+    parser.add_argument("--engine", choices=["calamine", "openpyxl"], help="Excel reader (default: builder's choice)")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="worker processes for the end-to-end run (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs to record, the fastest is reported (default: %(default)s)")
+    parser.add_argument("--results-dir", default=DEFAULT_RESULTS_DIR, help="where to store the JSON result (default: %(default)s)")
+    parser.add_argument("--label", default="", help="free text stored with the result, e.g. a release number")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.ERROR)  # Per-device warnings would distort the timings
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        workbook = args.workbook
+        parameters = {}
+        if workbook is None:
+            workbook = os.path.join(temp_dir, "export.xlsx")
+            parameters = {'devices': args.devices, 'spigots': args.spigots, 'dest_spigots': args.dest_spigots,
+                          'flows_per_spigot': args.flows_per_spigot}
+            start = time.perf_counter()
+            generate_export(workbook, args.devices, args.spigots, args.dest_spigots, args.flows_per_spigot)
+            print(f"Generated {workbook} in {time.perf_counter() - start:.1f}s")
+
+        runs = [run_once(workbook, os.path.join(temp_dir, "DummyDevices.xml"), args.engine, args.workers)
+                for _ in range(args.repeat)]
+        workbook_bytes = os.path.getsize(workbook)
+
+    best = min(runs, key=lambda run: run['end_to_end_s'])
+    result = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'label': args.label,
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'workbook': args.workbook or 'generated',
+        'workbook_bytes': workbook_bytes,
+        'parameters': parameters,
+        'engine': args.engine,
+        'workers': args.workers,
+        'best': best,
+        'runs': runs,
+    }
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    result_path = os.path.join(args.results_dir, f"{datetime.now():%Y%m%d-%H%M%S}-{result['revision'] or 'unknown'}.json")
+    with open(result_path, "w") as result_file:
+        json.dump(result, result_file, indent=2)
+
+    print(f"devices={best['devices']} source_flows={best['source_flows']} output={best['output_bytes'] / (1024 * 1024):.1f} MB")
+    for phase in ('ingest_s', 'generate_s', 'write_s', 'end_to_end_s'):
+        print(f"  {phase[:-2]:<11} {best[phase]:8.3f}s")
+    if best['peak_rss_mb'] is not None:
+        print(f"  peak RSS    {best['peak_rss_mb']:8.1f} MB")
+    print(f"Saved {result_path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import hashlib
+import json
+import logging
+import os
+
+# Sidecar cache for incremental rebuilds of a DummyDevices file.
+#
+# Every device is keyed by its GUID and a content hash of its device model, which holds
+# everything its XML is generated from. The cache stores that hash with the device's serialized <Device> fragment, so a
+# rebuild only regenerates devices whose rows changed and splices the cached fragments
+# for the rest. The cache is rewritten after every build with just the GUIDs of the
+# current export, so devices that disappear are evicted, and fragments beyond max_bytes
+# are not stored at all.
+
+CACHE_VERSION = 2  # Bump whenever the XML produced for the same rows changes
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Default sidecar location next to the XML output
+def default_cache_path(xml_path):
+    return xml_path + ".cache.json"
+
+# Function to hash every device's model, returns {GUID: hex digest}
+def device_hashes(data):
+    return {device.guid: hashlib.blake2b(repr(device.astuple()).encode(), digest_size=16).hexdigest()
+            for device in data.devices}
+
+class FragmentCache:
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.firm_ver = None
+        self.entries = {}  # GUID -> [content hash, serialized <Device>]
+        self.new_entries = {}
+        self.new_bytes = 0
+        self.hits = 0
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as cache_file:
+                stored = json.load(cache_file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable build cache {self.path}: {e}")
+            return
+
+        if stored.get("version") != CACHE_VERSION:
+            logging.info(f"Build cache {self.path} was written by another builder version, rebuilding all devices")
+            return
+        self.firm_ver = stored.get("firm_ver")
+        self.entries = stored.get("devices", {})
+
+    def get(self, guid, content_hash):
+        entry = self.entries.get(guid)
+        if entry is not None and entry[0] == content_hash:
+            self.hits += 1
+            return entry[1]
+        return None
+
+    def put(self, guid, content_hash, fragment):
+        # Stop storing once the budget is used; those devices are simply rebuilt next time
+        if self.new_bytes + len(fragment) > self.max_bytes:
+            return
+        self.new_entries[guid] = [content_hash, fragment]
+        self.new_bytes += len(fragment)
+
+    def save(self, firm_ver):
+        # Only GUIDs seen in this build are written back, evicting devices that disappeared
+        evicted = len(set(self.entries) - set(self.new_entries))
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as cache_file:
+            json.dump({"version": CACHE_VERSION, "firm_ver": firm_ver, "devices": self.new_entries}, cache_file)
+        os.replace(temp_path, self.path)
+        logging.info(f"Build cache saved: {len(self.new_entries)} devices ({self.new_bytes / (1024 * 1024):.1f} MB), "
+                     f"{self.hits} reused, {evicted} evicted")
@@ -0,0 +1,145 @@
+import contextlib
+import cProfile
+import io
+import json
+import logging
+import pstats
+import time
+import tracemalloc
+
+# Phase timings and work counters for one build.
+#
+# BuildProfile collects wall-clock seconds per phase (reading the workbook, building the
+# indexes, generating devices, writing XML, ...), the time spent generating each device and
+# counts of the work done (devices, spigots, flows, default-flow fallbacks). The summary is
+# logged as a table at the end of every build and can also be saved as JSON. For deeper
+# dives, deep_profile() wraps a build in cProfile or tracemalloc and dumps their stats.
+
+SLOWEST_DEVICES = 5  # Devices listed by name in the summary
+
+class BuildProfile:
+    def __init__(self):
+        self.phases = {}  # Phase name -> seconds, in the order phases ran
+        self.counters = {}
+        self.device_seconds = []  # Generation time of every device, in output order
+        self.device_guids = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    # Generator timing how long each item of devices takes to produce, recorded under phase name
+    def timed_devices(self, devices, name, guids=None):
+        if guids is not None:
+            self.device_guids = list(guids)
+        iterator = iter(devices)
+        while True:
+            start = time.perf_counter()
+            try:
+                device = next(iterator)
+            except StopIteration:
+                return
+            elapsed = time.perf_counter() - start
+            self.add_time(name, elapsed)
+            self.device_seconds.append(elapsed)
+            yield device
+
+    def device_stats(self):
+        if not self.device_seconds:
+            return None
+        ordered = sorted(self.device_seconds)
+        slowest = sorted(range(len(self.device_seconds)), key=self.device_seconds.__getitem__, reverse=True)
+        return {
+            'count': len(ordered),
+            'mean_ms': 1000 * sum(ordered) / len(ordered),
+            'p95_ms': 1000 * ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            'max_ms': 1000 * ordered[-1],
+            'slowest': [{'guid': self.device_guids[i] if i < len(self.device_guids) else None,
+                         'ms': 1000 * self.device_seconds[i]} for i in slowest[:SLOWEST_DEVICES]],
+        }
+
+    def to_dict(self):
+        return {
+            'total_s': sum(self.phases.values()),
+            'phases_s': self.phases,
+            'counters': self.counters,
+            'devices': self.device_stats(),
+        }
+
+    # Function to format the summary as a plain-text table
+    def summary(self, title):
+        total = sum(self.phases.values())
+        lines = [title, f"  {'phase':<24} {'seconds':>9} {'share':>7}"]
+        for name, seconds in self.phases.items():
+            share = 100 * seconds / total if total else 0.0
+            lines.append(f"  {name:<24} {seconds:9.3f} {share:6.1f}%")
+        lines.append(f"  {'total':<24} {total:9.3f}")
+        if self.counters:
+            lines.append("  " + ", ".join(f"{name}={value}" for name, value in self.counters.items()))
+
+        stats = self.device_stats()
+        if stats is not None:
+            lines.append(f"  per device: mean {stats['mean_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms, max {stats['max_ms']:.2f} ms")
+            slowest = [f"{device['guid']} ({device['ms']:.1f} ms)" for device in stats['slowest'] if device['guid'] is not None]
+            if slowest:
+                lines.append("  slowest: " + ", ".join(slowest))
+        return "\n".join(lines)
+
+    def log_summary(self, title):
+        logging.info(self.summary(title))
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as json_file:
+            json.dump(self.to_dict(), json_file, indent=2)
+        logging.info(f"Build timings saved: {path}")
+
+# Context manager running the enclosed build under cProfile ('cpu') or tracemalloc ('memory')
+# Stats are dumped to <path_prefix>.prof (open with pstats or snakeviz) or <path_prefix>.memory.txt
+# Only the calling process is profiled, worker processes of a parallel build are not
+@contextlib.contextmanager
+def deep_profile(mode, path_prefix):
+    if mode is None:
+        yield
+        return
+
+    if mode == 'cpu':
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            stats_path = path_prefix + ".prof"
+            profiler.dump_stats(stats_path)
+            top = io.StringIO()
+            pstats.Stats(profiler, stream=top).sort_stats('cumulative').print_stats(20)
+            logging.info(f"CPU profile saved: {stats_path}\n{top.getvalue()}")
+
+    elif mode == 'memory':
+        tracemalloc.start(10)
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            stats_path = path_prefix + ".memory.txt"
+            with open(stats_path, "w", encoding="utf-8") as stats_file:
+                stats_file.write(f"Peak traced memory: {peak / (1024 * 1024):.1f} MB, still allocated: {current / (1024 * 1024):.1f} MB\n\n")
+                for stat in snapshot.statistics('traceback')[:25]:
+                    stats_file.write(f"{stat}\n")
+                    stats_file.write("\n".join(stat.traceback.format()) + "\n\n")
+            logging.info(f"Memory profile saved: {stats_path} (peak {peak / (1024 * 1024):.1f} MB traced)")
+
+    else:
+        raise ValueError(f"Unknown profile mode: {mode}")
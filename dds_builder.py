@@ -0,0 +1,699 @@
+import argparse
+import copy
+import json
+import logging
+import os
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import repeat
+
+import pandas as pd
+
+from build_cache import FragmentCache, default_cache_path, device_hashes
+from build_profile import BuildProfile, deep_profile
+from device_model import Device, Flow, Spigot, intern_strings
+from export_reader import read_export_sheets
+from export_snapshot import read_export_sheets_cached
+from export_validation import ExportValidationError, validate_export_sheets
+from export_watcher import watch_files
+from output_shards import ShardWriter, default_manifest_path
+
+# Core of the DDS dummy device builder. Nothing in here touches tkinter, so it can be
+# imported by the GUI, used as a library, or run headless from the command line:
+#
+#   python dds_builder.py export-a.xlsx export-b.xlsx -o a.xml -o b.xml
+#
+# or from Python:
+#
+#   from dds_builder import build_dummy_devices
+#   build_dummy_devices("export.xlsx", "DummyDevices.xml")
+#
+# Several device types can be exported from one parse of the workbook, each to its own
+# file (<output>-<type>.xml) or all to one file with --combined:
+#
+#   python dds_builder.py export.xlsx -t GVOP -t IPG --type-settings types.json
+#
+# With --watch the builder keeps running and rebuilds an output whenever its export is saved:
+#
+#   python dds_builder.py export.xlsx -o DummyDevices.xml --watch -i
+
+DEFAULT_DEVICE_TYPE = "GVOP"
+DEFAULT_OUTPUT_NAME = "DummyDevices.xml"
+REPLACE_ATTEMPTS = 10
+REPLACE_RETRY_SECONDS = 0.1
+
+# XML settings used for a device type unless DEVICE_TYPE_SETTINGS or a --type-settings file overrides them
+DEFAULT_TYPE_SETTINGS = {
+    "format": "3G",
+    "link_speed_a": "25000",
+    "link_speed_b": "25000",
+    "default_caps_a": ["rfc_4175", "audio_pcm", "metadata"],  # Destination caps when source spigot 1 has no flows
+    "default_caps_b": ["rfc_4175", "audio_pcm", "metadata"],
+}
+
+# Settings differing from DEFAULT_TYPE_SETTINGS, by Device Type
+DEVICE_TYPE_SETTINGS = {
+    "GVOP": {},
+}
+
+CAPS_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_.-]*\Z")  # Valid as an XML attribute name
+
+# Dictionary for Flow Type replacements
+flow_type_replacements = {
+    "ST 2110-20": "rfc_4175",
+    "ST 2110-30": "audio_pcm",
+    "ST 2110-40": "metadata",
+    "ST 2022-6": "smpte2022_6"
+}
+
+def firm_version_timestamp():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+# Raised from a progress callback to stop loading or generation
+class BuildCancelled(Exception):
+    pass
+
+# Function to merge the settings of one device type, overrides maps Device Type -> settings
+def resolve_type_settings(device_type, overrides=None):
+    settings = copy.deepcopy(DEFAULT_TYPE_SETTINGS)
+    for layer in (DEVICE_TYPE_SETTINGS.get(device_type, {}), (overrides or {}).get(device_type, {})):
+        for name, value in layer.items():
+            if name not in settings:
+                raise ValueError(f"Unknown setting '{name}' for device type {device_type}")
+            if name.startswith("default_caps"):
+                # Each entry becomes an attribute name of <Caps>, e.g. <Caps rfc_4175="1" />
+                if not isinstance(value, list) or not all(isinstance(caps, str) and CAPS_NAME.match(caps) for caps in value):
+                    raise ValueError(f"Setting '{name}' for device type {device_type} must be a list of caps names such as \"rfc_4175\"")
+                settings[name] = list(value)
+            else:
+                if isinstance(value, bool) or not isinstance(value, (str, int)):
+                    raise ValueError(f"Setting '{name}' for device type {device_type} must be a string or a whole number")
+                settings[name] = str(value)
+    return settings
+
+# Function to read per device type settings from a JSON file such as {"IPG": {"format": "HD"}}
+def load_type_settings(path):
+    with open(path, "r", encoding="utf-8") as settings_file:
+        overrides = json.load(settings_file)
+    if not isinstance(overrides, dict) or not all(isinstance(layer, dict) for layer in overrides.values()):
+        raise ValueError(f"{path} must map each Device Type to an object of settings")
+    return overrides
+
+def replace_nan_with_empty_string(df):
+    # Replace nan values with empty strings in the DataFrame
+    return df.fillna('')
+
+# Device Names sheet of one IP Configurator export plus the device model built from all four sheets
+# type_settings maps Device Type -> settings overrides, see resolve_type_settings
+class ExportData:
+    def __init__(self, device_names, source_ports, destination_ports, source_flows, type_settings=None):
+        self.device_names = device_names  # Kept whole for display
+        self.load_phases = {}  # Seconds spent loading, filled in by load_export
+        self.validation = None  # ValidationReport of the sheets, set by load_export
+        self.build_model(source_ports, destination_ports, source_flows, type_settings)
+
+    # Function to view the devices of one type, sharing the model instead of building it again
+    def subset(self, device_type):
+        subset = copy.copy(self)
+        subset.device_names = self.device_names[self.device_names['Device Type'] == device_type]
+        subset.devices = [device for device in self.devices if device.device_type == device_type]
+        subset.load_phases = {}  # Loading was shared, see split_by_device_type
+        return subset
+
+    def build_model(self, source_ports, destination_ports, source_flows, type_settings=None):
+        # Group every table once so building a device is dictionary lookups instead of rescanning with boolean masks
+        enabled_flows = source_flows[source_flows['Flow Enabled'] == True]
+        flows = prepare_flows(enabled_flows)
+
+        strings = {}  # Shared copy of every repeated string
+        spigot_flows = {}  # (GUID, Spigot Index) -> enabled flows, both interfaces in sheet order
+        # Plain lists iterate far faster than pandas arrays
+        columns = [intern_strings(flows[name].tolist(), strings)
+                   for name in ['Interface', 'idx', 'caps_type', 'params_type', 'mcast_address', 'src_address', 'dst_port', 'src_port']]
+        for guid, spigot_index, fields in zip(flows['GUID'].tolist(), flows['Spigot Index'].tolist(), zip(*columns)):
+            spigot_flows.setdefault((guid, spigot_index), []).append(Flow(*fields))
+
+        first_flows = enabled_flows.drop_duplicates(['GUID', 'Interface'])
+        source_address_index = dict(zip(zip(first_flows['GUID'].tolist(), first_flows['Interface'].tolist()), first_flows['Source Address'].tolist()))  # (GUID, Interface) -> first Source Address
+        source_ports_index = group_spigot_indexes(source_ports)  # GUID -> Source Ports spigot indexes
+        destination_ports_index = group_spigot_indexes(destination_ports)  # GUID -> Destination Ports spigot indexes
+
+        # One Device per row of Device Names, so duplicated GUIDs still produce one device per row
+        self.devices = []
+        settings = {}  # Device Type -> settings, one shared dictionary per type
+        for guid, device_name, device_type, ip_address_a in zip(self.device_names['GUID'].tolist(), self.device_names['Device Name'].tolist(),
+                                                                self.device_names['Device Type'].tolist(), self.device_names['IP Address'].tolist()):
+            if device_type not in settings:
+                settings[device_type] = resolve_type_settings(device_type, type_settings)
+            first_spigot_flows = spigot_flows.get((guid, 1), [])
+            self.devices.append(Device(
+                str(guid), str(device_name), device_type, settings[device_type], str(ip_address_a),
+                str(source_address_index[(guid, 'B')]) if (guid, 'B') in source_address_index else None,
+                [Spigot(int(index), spigot_flows.get((guid, int(index)), [])) for index in source_ports_index.get(guid, [])],
+                [Spigot(int(index), spigot_flows.get((guid, int(index)), [])) for index in destination_ports_index.get(guid, [])],
+                [flow for flow in first_spigot_flows if flow.interface == 'A'],
+                [flow for flow in first_spigot_flows if flow.interface == 'B']))
+        logging.info(f"Indexed {len(enabled_flows)} enabled flows across {len(spigot_flows)} spigots.")
+
+def group_spigot_indexes(ports):
+    spigots = {}
+    for guid, spigot_index in zip(ports['GUID'].tolist(), ports['Spigot Index'].tolist()):
+        spigots.setdefault(guid, []).append(spigot_index)
+    return spigots
+
+def port_strings(ports):
+    # Ports as decimal strings, '' where the cell is empty
+    present = ports.notna()
+    strings = pd.Series('', index=ports.index, dtype=object)
+    strings[present] = ports[present].astype('int64').astype(str)
+    return strings
+
+# Function to derive every per-flow XML value as whole-column operations
+def prepare_flows(enabled_flows):
+    flows = enabled_flows[['GUID', 'Spigot Index', 'Interface']].copy()
+    # str() per value, as astype(str) leaves empty cells as NaN in newer pandas and NaN can't be serialized
+    flows['mcast_address'] = enabled_flows['Multicast Address'].map(str)
+    flows['src_address'] = enabled_flows['Source Address'].map(str)
+
+    # Replace flow types, and use 'metadata' for the Params type of 'meta' flows
+    flows['caps_type'] = enabled_flows['Flow Type'].replace(flow_type_replacements)
+    flows['params_type'] = flows['caps_type'].replace({"meta": "metadata"}).map(str)
+
+    # Use "Src RTP Port", falling back to "Dst RTP Port" where it is empty or the column doesn't exist
+    dst_ports = enabled_flows['Dst RTP Port']
+    src_ports = enabled_flows['Src RTP Port'] if 'Src RTP Port' in enabled_flows else dst_ports
+    flows['dst_port'] = port_strings(dst_ports)
+    flows['src_port'] = port_strings(src_ports.where(src_ports.notna(), dst_ports))
+
+    # Number Flow_A and Flow_B separately within each spigot
+    flows['idx'] = flows.groupby(['GUID', 'Spigot Index', 'Interface'], sort=False, dropna=False).cumcount().astype(str)
+    return flows
+
+# Function to read an IP Configurator export and keep the rows for one device type, or a list of them
+# With snapshot set, the parsed sheets are reused from (or saved to) a snapshot in the user's cache directory
+# The sheets are validated first (see export_validation) and ExportValidationError is raised if they have
+# errors, or warnings too with strict set. The report is kept as data.validation and, with validation_path
+# set, also saved there as JSON, whether or not the export passed
+def load_export(filepath, device_type=DEFAULT_DEVICE_TYPE, engine=None, progress=None, snapshot=False, type_settings=None,
+                strict=False, validation_path=None):
+    logging.info(f"Opening file: {filepath}")
+
+    # Read only the needed columns of the four sheets, filtered to the device types
+    start = time.perf_counter()
+    if snapshot:
+        sheets = read_export_sheets_cached(filepath, device_type, engine, progress)
+    else:
+        sheets = read_export_sheets(filepath, device_type, engine, progress)
+    read_seconds = time.perf_counter() - start
+
+    # Check the sheets before building the model, which can't convert some of the cells validation reports
+    validate_start = time.perf_counter()
+    report = validate_export_sheets(sheets)
+    validate_seconds = time.perf_counter() - validate_start
+    report.log_summary(f"Validation of {os.path.basename(filepath)}:")
+    if validation_path:
+        report.write_json(validation_path)
+    if report.failed(strict):
+        raise ExportValidationError(report)
+
+    df_device_names = replace_nan_with_empty_string(sheets['Device Names'])  # Replace nan values
+
+    model_start = time.perf_counter()
+    data = ExportData(df_device_names, sheets['Source Ports'], sheets['Destination Ports'], sheets['Source Flows'], type_settings)
+    data.validation = report
+    data.load_phases = {"read workbook": read_seconds, "validate export": validate_seconds,
+                        "build device model": time.perf_counter() - model_start}
+    logging.info("Data loaded successfully.")
+    return data
+
+# Function to record how much XML the export turns into, without generating any of it
+def count_export_work(data, profile):
+    profile.count("devices", len(data.devices))
+    for device in data.devices:
+        first_spigot_flows = len(device.first_flows_a) + len(device.first_flows_b)
+        profile.count("source_spigots", len(device.source_spigots))
+        profile.count("destination_spigots", len(device.destination_spigots))
+        profile.count("source_flows", sum(len(spigot.flows) for spigot in device.source_spigots))
+        # Destination spigots get the first source spigot's caps, or the defaults when it has no flows
+        default_flows = len(device.settings["default_caps_a"]) + len(device.settings["default_caps_b"])
+        profile.count("destination_flows", sum(len(spigot.flows) for spigot in device.destination_spigots)
+                      + len(device.destination_spigots) * (first_spigot_flows or default_flows))
+        if not first_spigot_flows:
+            profile.count("default_flow_fallbacks", len(device.destination_spigots))
+        if device.ip_address_b is None:
+            profile.count("devices_without_b_address")
+
+# Function to create Flow_A and Flow_B elements for each flow of a spigot
+def create_flow_elements(parent, guid, spigot, is_source_spigot):
+    for flow in spigot.flows:
+        if not flow.dst_port:
+            raise ValueError(f"Dst RTP Port is empty for GUID {guid}, Spigot Index {spigot.index}")
+
+        if flow.interface == "A":
+            logging.debug("Creating Flow_A: GUID=%s, Spigot Index=%s, Flow Type=%s", guid, spigot.index, flow.caps_type)
+            flow_element = ET.SubElement(parent, "Flow_A")
+        elif flow.interface == "B":
+            logging.debug("Creating Flow_B: GUID=%s, Spigot Index=%s, Flow Type=%s", guid, spigot.index, flow.caps_type)
+            flow_element = ET.SubElement(parent, "Flow_B")
+        else:
+            continue
+
+        flow_element.set("idx", flow.idx)
+        caps_element = ET.SubElement(flow_element, "Caps")
+        caps_element.set(flow.caps_type, "1")
+
+        if is_source_spigot:
+            params_element = ET.SubElement(flow_element, "Params")
+            params_element.set("mcastAddress", flow.mcast_address)
+            params_element.set("srcAddress", flow.src_address)
+            params_element.set("dstPort", flow.dst_port)
+            params_element.set("srcPort", flow.src_port)
+            params_element.set("type", flow.params_type)
+
+    # Calculate numFlows_A and numFlows_B for destination spigots
+    if not is_source_spigot:
+        num_flows_a = 3  # Assuming 3 Flow_A elements per destination spigot
+        num_flows_b = 3  # Assuming 3 Flow_B elements per destination spigot
+
+        parent.set("numFlows_A", str(num_flows_a))
+        parent.set("numFlows_B", str(num_flows_b))
+
+def add_default_flows(dst_spigot, flow_a_types=DEFAULT_TYPE_SETTINGS["default_caps_a"], flow_b_types=DEFAULT_TYPE_SETTINGS["default_caps_b"]):
+    # Add default Flow_A elements
+    for idx, flow_type in enumerate(flow_a_types):
+        flow_a = ET.SubElement(dst_spigot, "Flow_A")
+        flow_a.set("idx", str(idx))
+        caps_element_a = ET.SubElement(flow_a, "Caps")
+        caps_element_a.set(flow_type, "1")
+
+    # Add default Flow_B elements
+    for idx, flow_type in enumerate(flow_b_types):
+        flow_b = ET.SubElement(dst_spigot, "Flow_B")
+        flow_b.set("idx", str(idx))
+        caps_element_b = ET.SubElement(flow_b, "Caps")
+        caps_element_b.set(flow_type, "1")
+
+# Function to copy Caps to destination spigots for all flow types
+def copy_caps_to_destination_spigots(dst_spigot, flows_a, flows_b):
+    # Copy all Flow_A and then all Flow_B from the first source spigot, idx restarting per spigot
+    for tag, flows in (("Flow_A", flows_a), ("Flow_B", flows_b)):
+        for idx, flow in enumerate(flows):
+            flow_element = ET.SubElement(dst_spigot, tag)
+            flow_element.set("idx", str(idx))
+            caps_element = ET.SubElement(flow_element, "Caps")
+            caps_element.set(flow.caps_type, "1")  # Assuming count of 1 for each cap type
+
+# Function to build the Flow_A/Flow_B caps every destination spigot of a device starts with
+def destination_caps_template(device):
+    template = ET.Element("Spigot")
+    if not device.first_flows_a and not device.first_flows_b:
+        # No source spigots found, add default Flow_A and Flow_B elements
+        add_default_flows(template, device.settings["default_caps_a"], device.settings["default_caps_b"])
+
+    # Copy all Flow_A and Flow_B instances from the first source spigot
+    copy_caps_to_destination_spigots(template, device.first_flows_a, device.first_flows_b)
+    return list(template)
+
+# Function to build the <Device> element for one device of the model
+def create_device_element(device, firm_ver=None):
+    settings = device.settings
+    # Source address of the first Interface B flow
+    source_address_b = device.ip_address_b
+    if source_address_b is None:
+        source_address_b = ""  # Default value if no valid address found
+        logging.warning("No valid source address found for GUID %s and Interface B.", device.guid)
+
+    element = ET.Element("Device")
+    element.set("guid", device.guid)
+    element.set("typeName", device.name)
+    element.set("softVer", "DummyDDS")
+    element.set("firmVer", firm_ver or firm_version_timestamp())  # Build time unless a fixed version is given
+    element.set("ipAddressA", device.ip_address_a)
+    element.set("ipAddressB", source_address_b)
+    element.set("linkSpeedA", settings["link_speed_a"])
+    element.set("linkSpeedB", settings["link_speed_b"])
+
+    # Count number of source and destination spigots
+    element.set("numSources", str(len(device.source_spigots)))
+    element.set("numDests", str(len(device.destination_spigots)))
+
+    # Process Source Spigots for the current device
+    for spigot in device.source_spigots:
+        src_spigot = ET.SubElement(element, "Spigot")
+        src_spigot.set("idx", str(spigot.index - 1))  # Convert 1-based to 0-based index
+        src_spigot.set("mode", "src")
+        src_spigot.set("format", settings["format"])
+        src_spigot.set("numFlows_A", str(spigot.num_flows_a))
+        src_spigot.set("numFlows_B", str(spigot.num_flows_b))
+
+        # Create Flow_A and Flow_B elements for the current source spigot
+        create_flow_elements(src_spigot, device.guid, spigot, is_source_spigot=True)
+
+    # The caps are the same for every destination spigot, so they are built once and the same
+    # elements are appended to each spigot (ElementTree serializes a shared child under every parent)
+    caps_template = destination_caps_template(device) if device.destination_spigots else []
+
+    # Process Destination Spigots for the current device
+    for spigot in device.destination_spigots:
+        dst_spigot = ET.SubElement(element, "Spigot")
+        dst_spigot.set("idx", str(spigot.index - 1))  # Convert 1-based to 0-based index
+        dst_spigot.set("mode", "dst")
+        dst_spigot.set("format", settings["format"])
+
+        dst_spigot.set("numFlows_A", str(len(device.first_flows_a)))
+        dst_spigot.set("numFlows_B", str(len(device.first_flows_b)))
+        dst_spigot.extend(caps_template)
+
+        # Create Flow_A and Flow_B elements for the current destination spigot
+        create_flow_elements(dst_spigot, device.guid, spigot, is_source_spigot=False)
+
+    return element
+
+# Generator yielding one finished <Device> element per row of the Device Names sheet (or the given subset of devices)
+def iter_device_elements(data, firm_ver=None, devices=None):
+    for device in data.devices if devices is None else devices:
+        yield create_device_element(device, firm_ver)
+
+# Function to split the devices into slices of consecutive devices, keeping device order
+def partition_devices(devices, partitions):
+    size = max(1, -(-len(devices) // partitions))  # Ceiling division
+    return [devices[start:start + size] for start in range(0, len(devices), size)]
+
+# Worker processes log straight to stderr, the parent's queue listener does not run in them
+def init_worker_logging(level):
+    logging.basicConfig(level=level, format='%(asctime)s - worker %(process)d - %(levelname)s - %(message)s', force=True)
+
+# Worker entry point: build and serialize the devices of one partition
+def serialize_partition(devices, firm_ver=None):
+    return [ET.tostring(create_device_element(device, firm_ver), encoding='unicode') for device in devices]
+
+# Generator yielding serialized devices built across a process pool, in Device Names order
+def iter_device_fragments_parallel(data, workers, firm_ver=None, devices=None):
+    # A few partitions per worker keeps the pool busy when device sizes are uneven
+    slices = partition_devices(data.devices if devices is None else devices, workers * 4)
+    logging.info(f"Generating {sum(len(devices) for devices in slices)} devices in {len(slices)} partitions across {workers} worker processes")
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker_logging,
+                                   initargs=(logging.getLogger().getEffectiveLevel(),))
+    try:
+        for fragments in executor.map(serialize_partition, slices, repeat(firm_ver)):
+            yield from fragments
+    finally:
+        # Drop partitions not started yet if the build stops early (error or cancel)
+        executor.shutdown(wait=True, cancel_futures=True)
+
+# Generator yielding serialized devices, reusing cached fragments for devices whose content is unchanged
+def iter_device_fragments_cached(data, cache, workers=1, firm_ver=None):
+    hashes = device_hashes(data)
+    guids = [device.guid for device in data.devices]
+    duplicated = {guid for guid, count in Counter(guids).items() if count > 1}  # Never cached, always rebuilt
+
+    cached = {}
+    for guid in guids:
+        if guid not in duplicated:
+            fragment = cache.get(guid, hashes[guid])
+            if fragment is not None:
+                cached[guid] = fragment
+
+    # Only the changed devices are generated, in Device Names order
+    stale_devices = [device for device in data.devices if device.guid not in cached]
+    logging.info(f"Incremental build: {len(cached)} devices unchanged, {len(stale_devices)} to regenerate")
+    if workers > 1 and len(stale_devices) > 1:
+        fresh = iter_device_fragments_parallel(data, workers, firm_ver, stale_devices)
+    else:
+        fresh = (ET.tostring(device, encoding='unicode') for device in iter_device_elements(data, firm_ver, stale_devices))
+
+    for guid in guids:
+        fragment = cached.get(guid)
+        if fragment is None:
+            fragment = next(fresh)
+        if guid not in duplicated:
+            cache.put(guid, hashes[guid], fragment)
+        yield fragment
+
+# File wrapper counting the characters written, for progress reports
+class CountingWriter:
+    def __init__(self, xml_file):
+        self.xml_file = xml_file
+        self.written = 0
+
+    def write(self, text):
+        self.written += len(text)
+        return self.xml_file.write(text)
+
+# Function to stream devices into an open text file, one device at a time
+def write_device_elements(xml_file, devices, total=None, progress=None):
+    writer = CountingWriter(xml_file)
+    count = 0
+    for device in devices:
+        if count:
+            writer.write('\n')
+        if isinstance(device, str):
+            writer.write(device)  # Already serialized by a worker process or the build cache
+        else:
+            # Serialize straight into the file so only the current device is ever held in memory
+            ET.ElementTree(device).write(writer, encoding='unicode')
+        count += 1
+        if progress is not None:
+            progress(f"Generated {count} of {total} devices, {writer.written / (1024 * 1024):.1f} MB written", count, total)
+    return count
+
+# Function to stream devices into shards of filepath plus a manifest (see output_shards), returns the number of devices written
+# guids are the GUIDs of devices in the same order, finished shards are written on workers threads
+def write_device_shards(filepath, devices, guids, max_devices=None, max_bytes=None, workers=1, progress=None):
+    shards = ShardWriter(filepath, max_devices, max_bytes, workers, replace_file)
+    try:
+        for guid, device in zip(guids, devices):
+            # Shards are cut by size, so every device is serialized before it is placed
+            shards.add(guid, device if isinstance(device, str) else ET.tostring(device, encoding='unicode'))
+            if progress is not None:
+                progress(f"Generated {shards.devices} of {len(guids)} devices, {len(shards.paths) + 1} shards", shards.devices, len(guids))
+        shards.close()
+    except Exception:
+        shards.abort()
+        raise
+    return shards.devices
+
+# Function to move a finished file over the output, retrying while another program holds the output open (Windows)
+def replace_file(temp_path, filepath, attempts=REPLACE_ATTEMPTS):
+    for attempt in range(attempts):
+        try:
+            os.replace(temp_path, filepath)
+            return
+        except PermissionError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(REPLACE_RETRY_SECONDS)
+
+# Function to write the DummyDevices XML for a loaded export, returns the number of devices written
+# The XML is written to <filepath>.tmp and moved over filepath once complete, so readers of the
+# output only ever see the previous file or the new one, never a partly written file
+# progress, if given, is called as progress(message, done, total) after every device and may raise
+# BuildCancelled to stop the build, in which case the previous output file is left as it was
+# profile, if given, collects the phase timings and counters that are logged at the end of the build
+# With shard_devices and/or shard_bytes set, the devices are split over <stem>.part0001.xml, ... files
+# listed in <filepath>.manifest.json instead of being written to filepath
+def process_and_create_xml(data, filepath, workers=1, firm_ver=None, cache_path=None, progress=None, profile=None,
+                           shard_devices=None, shard_bytes=None):
+    if profile is None:
+        profile = BuildProfile()
+    for name, seconds in data.load_phases.items():
+        profile.add_time(name, seconds)
+    temp_path = filepath + ".tmp"
+    try:
+        logging.info(f"Creating XML file: {filepath}")
+        count_export_work(data, profile)
+
+        cache = None
+        if cache_path:
+            with profile.phase("load build cache"):
+                cache = FragmentCache(cache_path)
+                cache.load()
+            # Cached fragments carry their firmVer, so an incremental build keeps one fixed value
+            firm_ver = firm_ver or cache.firm_ver or firm_version_timestamp()
+            if cache.firm_ver != firm_ver:
+                cache.entries = {}
+
+        if cache is not None:
+            devices = iter_device_fragments_cached(data, cache, workers, firm_ver)
+        elif workers > 1 and len(data.devices) > 1:
+            devices = iter_device_fragments_parallel(data, workers, firm_ver)
+        else:
+            devices = iter_device_elements(data, firm_ver)
+        # Generation is lazy, so the time spent waiting for each device is generation and the rest is writing
+        guids = [device.guid for device in data.devices]
+        devices = profile.timed_devices(devices, "generate devices", guids)
+
+        # Write XML to file as each device is completed
+        start = time.perf_counter()
+        if shard_devices or shard_bytes:
+            count = write_device_shards(filepath, devices, guids, shard_devices, shard_bytes, workers, progress)
+        else:
+            # UTF-8 whatever the locale (cp1252 on Windows), as the XML has no declaration and readers assume it
+            with open(temp_path, "w", encoding="utf-8") as xml_file:
+                count = write_device_elements(xml_file, devices, len(data.devices), progress)
+            replace_file(temp_path, filepath)
+        profile.add_time("write XML", time.perf_counter() - start - profile.phases.get("generate devices", 0.0))
+
+        if cache is not None:
+            profile.count("cached_devices", cache.hits)
+            with profile.phase("save build cache"):
+                cache.save(firm_ver)
+
+        if shard_devices or shard_bytes:
+            logging.info(f"XML shards created successfully: {default_manifest_path(filepath)} ({count} devices)")
+        else:
+            logging.info(f"XML file created successfully: {filepath} ({count} devices)")
+        profile.log_summary(f"Build timings for {os.path.basename(filepath)}:")
+        return count
+
+    except BuildCancelled:
+        logging.warning(f"XML file creation cancelled: {filepath}")
+        raise
+
+    except Exception as e:
+        logging.error(f"Error creating XML file: {e}")
+        raise
+
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+# Library entry point: convert one export workbook into a DummyDevices XML file
+# device_type may be a list, in which case all of those types are written to the one file
+def build_dummy_devices(xlsx_path, out_path, device_type=DEFAULT_DEVICE_TYPE, engine=None, workers=1, firm_ver=None, cache_path=None, profile=None,
+                        snapshot=False, type_settings=None, strict=False, shard_devices=None, shard_bytes=None):
+    data = load_export(xlsx_path, device_type, engine, snapshot=snapshot, type_settings=type_settings, strict=strict)
+    return process_and_create_xml(data, out_path, workers, firm_ver, cache_path, profile=profile,
+                                  shard_devices=shard_devices, shard_bytes=shard_bytes)
+
+# <output>-<type>.xml, e.g. DummyDevices-GVOP.xml
+def typed_output_path(out_path, device_type):
+    stem, extension = os.path.splitext(out_path)
+    return f"{stem}-{device_type}{extension or '.xml'}"
+
+# Function to pair a loaded export with the files to write, one per device type unless combined
+def split_by_device_type(data, out_path, device_types, combined=False):
+    if combined or len(device_types) == 1:
+        return [(data, out_path)]
+    targets = [(data.subset(device_type), typed_output_path(out_path, device_type)) for device_type in device_types]
+    targets[0][0].load_phases = data.load_phases  # The one load is booked on the first file's timings only
+    return targets
+
+# Function to pair every input workbook with the XML file it should produce
+def resolve_output_paths(inputs, outputs, output_dir):
+    if outputs:
+        if len(outputs) != len(inputs):
+            raise ValueError(f"Got {len(inputs)} input files but {len(outputs)} output paths")
+        return list(outputs)
+
+    if len(inputs) == 1 and output_dir is None:
+        return [DEFAULT_OUTPUT_NAME]
+
+    paths = []
+    for xlsx_path in inputs:
+        directory = output_dir if output_dir is not None else os.path.dirname(xlsx_path)
+        name = os.path.splitext(os.path.basename(xlsx_path))[0] + ".xml"
+        paths.append(os.path.join(directory, name))
+    return paths
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Create DDS dummy device files from IP Configurator exports without the GUI.")
+    parser.add_argument("inputs", nargs="+", metavar="XLSX", help="IP Configurator export workbook(s)")
+    parser.add_argument("-o", "--output", action="append", dest="outputs", metavar="XML",
+                        help="output file, repeat once per input (default: DummyDevices.xml for a single input, <input>.xml otherwise)")
+    parser.add_argument("-d", "--output-dir", help="directory for <input>.xml outputs when --output is not given")
+    parser.add_argument("-t", "--device-type", action="append", dest="device_types", metavar="TYPE",
+                        help=f"Device Type to export, repeat for several types from one parse of the workbook (default: {DEFAULT_DEVICE_TYPE})")
+    parser.add_argument("--combined", action="store_true",
+                        help="write every device type to the one output file instead of <output>-<type>.xml per type")
+    parser.add_argument("--type-settings", metavar="JSON",
+                        help='per device type format, link_speed_a/b and default_caps_a/b, e.g. {"IPG": {"format": "HD"}}')
+    parser.add_argument("--engine", choices=["calamine", "openpyxl"], help="Excel reader (default: calamine when installed, else openpyxl)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="worker processes for XML generation, 0 for one per CPU (default: %(default)s)")
+    parser.add_argument("--firm-ver", help="fixed firmVer for every device (default: build time)")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="reuse (or save) a snapshot of the parsed workbook in the user's cache directory, so reopening it skips the parse")
+    parser.add_argument("-i", "--incremental", action="store_true",
+                        help="only regenerate devices whose rows changed, using a <output>.cache.json sidecar")
+    parser.add_argument("--strict", action="store_true",
+                        help="stop on validation warnings (duplicate multicast groups, flows for unlisted spigots, ...) as well as errors")
+    parser.add_argument("--validation-report", action="store_true",
+                        help="also save the validation issues found in each input to <output>.validation.json")
+    parser.add_argument("--shard-devices", type=int, metavar="N",
+                        help="split each output into <output stem>.part0001.xml, ... files of at most N devices, listed in <output>.manifest.json")
+    parser.add_argument("--shard-size", type=float, metavar="MB",
+                        help="split each output into files of at most MB megabytes (with --shard-devices, whichever limit is reached first)")
+    parser.add_argument("--timings", action="store_true",
+                        help="also save the phase timings and counters logged after each build to <output>.timings.json")
+    parser.add_argument("--profile", choices=["cpu", "memory"],
+                        help="run each build under cProfile (<output>.prof) or tracemalloc (<output>.memory.txt)")
+    parser.add_argument("-w", "--watch", action="store_true",
+                        help="keep running and rebuild whenever an input workbook is saved (stop with Ctrl+C)")
+    parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], type=str.upper,
+                        help="log level for the console and DummyDeviceBuilder.log (default: $DDS_LOG_LEVEL or INFO)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    workers = args.workers if args.workers > 0 else os.cpu_count() or 1
+
+    from logger_config import configure_logging
+    configure_logging(args.log_level)
+
+    device_types = list(dict.fromkeys(args.device_types or [DEFAULT_DEVICE_TYPE]))  # Drop repeats, keep order
+    try:
+        output_paths = resolve_output_paths(args.inputs, args.outputs, args.output_dir)
+        type_settings = load_type_settings(args.type_settings) if args.type_settings else None
+        for device_type in device_types:
+            resolve_type_settings(device_type, type_settings)  # Report unknown settings before parsing anything
+        if (args.shard_devices is not None and args.shard_devices < 1) or (args.shard_size is not None and args.shard_size <= 0):
+            raise ValueError("--shard-devices and --shard-size must be positive")
+        shard_bytes = int(args.shard_size * 1024 * 1024) if args.shard_size else None
+    except (OSError, ValueError) as e:
+        logging.error(str(e))
+        return 2
+
+    # Function to convert one input, returns False if it failed
+    def convert(xlsx_path, out_path):
+        try:
+            with deep_profile(args.profile, out_path):
+                # One parse and one device model for all the types, then one file per type (or one in total)
+                data = load_export(xlsx_path, device_types, args.engine, snapshot=args.snapshot, type_settings=type_settings,
+                                   strict=args.strict, validation_path=out_path + ".validation.json" if args.validation_report else None)
+                for target_data, target_path in split_by_device_type(data, out_path, device_types, args.combined):
+                    cache_path = default_cache_path(target_path) if args.incremental else None
+                    profile = BuildProfile()
+                    process_and_create_xml(target_data, target_path, workers, args.firm_ver, cache_path, profile=profile,
+                                           shard_devices=args.shard_devices, shard_bytes=shard_bytes)
+                    if args.timings:
+                        profile.write_json(target_path + ".timings.json")
+            return True
+        except Exception as e:
+            logging.error(f"Failed to convert {xlsx_path}: {e}")
+            return False
+
+    failures = 0
+    for xlsx_path, out_path in zip(args.inputs, output_paths):
+        if not convert(xlsx_path, out_path):
+            failures += 1
+
+    if args.watch:
+        outputs = dict(zip(args.inputs, output_paths))
+        logging.info(f"Watching {len(outputs)} export(s) for changes, press Ctrl+C to stop")
+        try:
+            # A failed rebuild (e.g. a workbook saved mid-edit) is logged and retried on the next save
+            watch_files(list(outputs), lambda xlsx_path: convert(xlsx_path, outputs[xlsx_path]))
+        except KeyboardInterrupt:
+            logging.info("Stopped watching")
+        return 0
+
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
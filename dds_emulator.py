@@ -0,0 +1,242 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from urllib.parse import unquote
+
+from export_watcher import file_signature
+
+# Local emulator serving the devices of a DummyDevices XML file over HTTP, for load testing.
+#
+# The XML is read with an incremental pull parser one <Device> at a time, so large files are
+# never held as a whole tree, and every device is turned into JSON once at load time. A
+# single asyncio server then answers, with keep-alive:
+#
+#   GET /health                               device count and load time
+#   GET /devices                              guid, typeName and addresses of every device
+#   GET /devices/<guid>                       the device with all its spigots and flows
+#   GET /devices/<guid>/spigots/<mode>/<idx>  one spigot, mode is src or dst
+#
+# With --device-ports BASE, every device also gets its own listener on BASE + n (in file
+# order) answering GET / with that device, for clients that expect one endpoint per device.
+# With --watch the file is reloaded whenever the builder replaces it.
+#
+#   python dds_emulator.py DummyDevices.xml --port 8080
+#   python benchmarks/emulator_load_test.py --url http://127.0.0.1:8080 --connections 50
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+READ_CHUNK_BYTES = 1024 * 1024
+WATCH_SECONDS = 1.0
+MAX_HEADER_BYTES = 16 * 1024
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+# Function to turn one <Spigot> element into a dictionary
+def spigot_state(spigot):
+    state = dict(spigot.attrib)
+    state["flows"] = []
+    for flow in spigot:
+        params = flow.find("Params")
+        caps = flow.find("Caps")
+        state["flows"].append({
+            "interface": flow.tag[-1],  # Flow_A / Flow_B
+            "idx": flow.get("idx"),
+            "caps": dict(caps.attrib) if caps is not None else {},
+            "params": dict(params.attrib) if params is not None else None,  # Destination flows have no Params
+        })
+    return state
+
+# Generator yielding (device attributes, spigot states) for every <Device> in a DummyDevices file
+def iter_device_states(path):
+    # The file is a sequence of <Device> elements without a common root, so one is fed in around it
+    parser = ET.XMLPullParser(events=("end",))
+    parser.feed("<DummyDevices>")
+    with open(path, "r", encoding="utf-8") as xml_file:  # The builder always writes UTF-8
+        for chunk in iter(lambda: xml_file.read(READ_CHUNK_BYTES), ""):
+            parser.feed(chunk)
+            yield from completed_devices(parser)
+    parser.feed("</DummyDevices>")
+    yield from completed_devices(parser)
+    parser.close()
+
+def completed_devices(parser):
+    for _, element in parser.read_events():
+        if element.tag == "Device":
+            yield dict(element.attrib), [spigot_state(spigot) for spigot in element]
+            element.clear()  # Keep memory flat however many devices the file has
+
+# Devices of one DummyDevices file as ready-to-send JSON bodies
+class DeviceStore:
+    def __init__(self, path):
+        self.path = path
+        self.devices = {}  # guid -> JSON body of the whole device
+        self.spigots = {}  # (guid, mode, idx) -> JSON body of one spigot
+        self.order = []  # guids in file order
+        self.summary = b"[]"
+        self.signature = None
+        self.load_seconds = 0.0
+
+    def load(self):
+        start = time.perf_counter()
+        signature = file_signature(self.path)
+        devices, spigots, order, summary = {}, {}, [], []
+        for attributes, spigot_states in iter_device_states(self.path):
+            guid = attributes.get("guid")
+            devices[guid] = json.dumps({**attributes, "spigots": spigot_states}).encode()
+            for spigot in spigot_states:
+                spigots[(guid, spigot.get("mode"), spigot.get("idx"))] = json.dumps(spigot).encode()
+            order.append(guid)
+            summary.append({name: attributes.get(name) for name in ("guid", "typeName", "ipAddressA", "ipAddressB")})
+
+        # Swap everything at once, so requests never see half of an old and half of a new file
+        self.devices, self.spigots, self.order = devices, spigots, order
+        self.summary = json.dumps(summary).encode()
+        self.signature = signature
+        self.load_seconds = time.perf_counter() - start
+        logging.info(f"Loaded {len(order)} devices from {self.path} in {self.load_seconds:.2f}s")
+
+    def health(self):
+        return json.dumps({"devices": len(self.order), "file": self.path, "load_seconds": round(self.load_seconds, 3)}).encode()
+
+    # Function to answer a GET for path, returns (status, body)
+    def route(self, path):
+        parts = [unquote(part) for part in path.split("?", 1)[0].split("/") if part]  # GUIDs may arrive as %7B...%7D
+        if parts == ["health"]:
+            return 200, self.health()
+        if parts == ["devices"]:
+            return 200, self.summary
+        if len(parts) == 2 and parts[0] == "devices" and parts[1] in self.devices:
+            return 200, self.devices[parts[1]]
+        if len(parts) == 5 and parts[0] == "devices" and parts[2] == "spigots":
+            body = self.spigots.get((parts[1], parts[3], parts[4]))
+            if body is not None:
+                return 200, body
+        return 404, json.dumps({"error": f"No such resource: {path}"}).encode()
+
+def http_response(status, body, keep_alive):
+    head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("ascii") + body
+
+# Connection handler for a minimal HTTP/1.1 server, answer(path) returns (status, body)
+async def serve_http(reader, writer, answer):
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.LimitOverrunError:
+                writer.write(http_response(400, b'{"error": "Request header too large"}', False))
+                break
+            except asyncio.IncompleteReadError:
+                break  # Client closed the connection
+
+            lines = head.decode("latin-1").split("\r\n")
+            request = lines[0].split()
+            if len(request) != 3:
+                writer.write(http_response(400, b'{"error": "Malformed request line"}', False))
+                break
+            method, path, version = request
+            headers = {name.strip().lower(): value.strip() for name, _, value in (line.partition(":") for line in lines[1:] if line)}
+            keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+            length = int(headers.get("content-length", "0") or 0)
+            if length:
+                await reader.readexactly(length)  # Bodies are not used, just skipped
+
+            if method != "GET":
+                writer.write(http_response(405, b'{"error": "Only GET is supported"}', keep_alive))
+            else:
+                writer.write(http_response(*answer(path), keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+# Function to start one listener per device on consecutive ports, returns the servers
+async def start_device_servers(store, host, base_port):
+    servers = []
+    for number, guid in enumerate(store.order):
+        # The device is looked up on every request so a reload is picked up
+        def answer(path, guid=guid):
+            body = store.devices.get(guid)
+            return (200, body) if body is not None else (404, b'{"error": "Device no longer exists"}')
+        try:
+            servers.append(await asyncio.start_server(lambda r, w, a=answer: serve_http(r, w, a), host, base_port + number,
+                                                      limit=MAX_HEADER_BYTES))
+        except OSError as e:
+            logging.error(f"Could not open port {base_port + number} for device {guid}: {e}, "
+                          f"serving {len(servers)} devices on their own ports")
+            break
+    logging.info(f"Serving {len(servers)} devices on ports {base_port}-{base_port + len(servers) - 1}")
+    return servers
+
+# Task reloading the store whenever the file is replaced, e.g. by the builder's --watch mode
+async def watch_store(store):
+    while True:
+        await asyncio.sleep(WATCH_SECONDS)
+        signature = file_signature(store.path)
+        if signature is not None and signature != store.signature:
+            try:
+                # Parsing is CPU work, keep it off the event loop so requests are still answered
+                await asyncio.to_thread(store.load)
+            except (OSError, ValueError, ET.ParseError) as e:  # ValueError covers UnicodeDecodeError
+                logging.warning(f"Keeping the previous devices, could not reload {store.path}: {e}")
+                store.signature = signature  # Wait for the next change instead of retrying every second
+
+async def run_emulator(path, host=DEFAULT_HOST, port=DEFAULT_PORT, device_ports=None, watch=False):
+    store = DeviceStore(path)
+    store.load()
+
+    server = await asyncio.start_server(lambda r, w: serve_http(r, w, store.route), host, port, limit=MAX_HEADER_BYTES)
+    logging.info(f"Serving {len(store.order)} devices on http://{host}:{port}/devices")
+    device_servers = await start_device_servers(store, host, device_ports) if device_ports else []
+    watcher = asyncio.create_task(watch_store(store)) if watch else None
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        for device_server in device_servers:
+            device_server.close()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the devices of a DummyDevices XML file over HTTP for load testing.")
+    parser.add_argument("xml", nargs="?", default="DummyDevices.xml", help="DummyDevices file to serve (default: %(default)s)")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to listen on (default: %(default)s)")
+    parser.add_argument("-p", "--port", type=int, default=DEFAULT_PORT, help="port of the main endpoint (default: %(default)s)")
+    parser.add_argument("--device-ports", type=int, metavar="BASE",
+                        help="also give every device its own endpoint on ports BASE, BASE+1, ...")
+    parser.add_argument("-w", "--watch", action="store_true", help="reload the file whenever it is replaced")
+    parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], type=str.upper, default="INFO",
+                        help="log level (default: %(default)s)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if not os.path.exists(args.xml):
+        logging.error(f"No such file: {args.xml}")
+        return 2
+    try:
+        asyncio.run(run_emulator(args.xml, args.host, args.port, args.device_ports, args.watch))
+    except KeyboardInterrupt:
+        logging.info("Emulator stopped")
+    except (OSError, ValueError, ET.ParseError) as e:
+        logging.error(str(e))
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
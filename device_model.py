@@ -0,0 +1,83 @@
+# Compact in-memory model of the devices in an export, between the spreadsheet and the XML.
+#
+# The export sheets are read into DataFrames once and converted into Device, Spigot and
+# Flow objects holding exactly the values the XML needs, already formatted as strings.
+# The classes use __slots__ so a flow costs a few pointers instead of a pandas row, and
+# repeated strings (Flow Types, idx, ports, addresses) are interned so all flows share one
+# copy of each. The DataFrames can be dropped once the model is built, and every exporter
+# works from the model instead of looking rows up in pandas.
+
+FLOW_FIELDS = ('interface', 'idx', 'caps_type', 'params_type', 'mcast_address', 'src_address', 'dst_port', 'src_port')
+
+# Function to share one object per distinct string in values, table maps each string to its shared copy
+def intern_strings(values, table):
+    return [table.setdefault(value, value) if isinstance(value, str) else value for value in values]
+
+# One enabled row of the Source Flows sheet
+class Flow:
+    __slots__ = FLOW_FIELDS
+
+    def __init__(self, interface, idx, caps_type, params_type, mcast_address, src_address, dst_port, src_port):
+        self.interface = interface
+        self.idx = idx  # Position among the spigot's flows on the same interface, as a string
+        self.caps_type = caps_type  # Flow Type after flow_type_replacements
+        self.params_type = params_type
+        self.mcast_address = mcast_address
+        self.src_address = src_address
+        self.dst_port = dst_port  # Decimal string, '' when the cell is empty
+        self.src_port = src_port
+
+    def astuple(self):
+        return (self.interface, self.idx, self.caps_type, self.params_type, self.mcast_address, self.src_address,
+                self.dst_port, self.src_port)
+
+    # Pickle as a plain tuple, much smaller and faster than the default for __slots__ classes
+    def __reduce__(self):
+        return (Flow, self.astuple())
+
+# A source or destination spigot with the enabled flows the Source Flows sheet lists for its index
+class Spigot:
+    __slots__ = ('index', 'flows', 'num_flows_a', 'num_flows_b')
+
+    def __init__(self, index, flows):
+        self.index = index  # 1-based Spigot Index from the ports sheet
+        self.flows = flows  # Both interfaces, in sheet order
+        self.num_flows_a = sum(1 for flow in flows if flow.interface == "A")
+        self.num_flows_b = sum(1 for flow in flows if flow.interface == "B")
+
+    def astuple(self):
+        return (self.index, tuple(flow.astuple() for flow in self.flows))
+
+    def __reduce__(self):
+        return (Spigot, (self.index, self.flows))
+
+# One row of the Device Names sheet with its spigots
+class Device:
+    __slots__ = ('guid', 'name', 'device_type', 'settings', 'ip_address_a', 'ip_address_b', 'source_spigots',
+                 'destination_spigots', 'first_flows_a', 'first_flows_b')
+
+    def __init__(self, guid, name, device_type, settings, ip_address_a, ip_address_b, source_spigots, destination_spigots,
+                 first_flows_a, first_flows_b):
+        self.guid = guid
+        self.name = name
+        self.device_type = device_type
+        self.settings = settings  # XML settings of the device type, shared by every device of that type
+        self.ip_address_a = ip_address_a
+        self.ip_address_b = ip_address_b  # Source Address of the first B flow, None when there is none
+        self.source_spigots = source_spigots
+        self.destination_spigots = destination_spigots
+        # Flows of source spigot 1, whose caps every destination spigot advertises
+        self.first_flows_a = first_flows_a
+        self.first_flows_b = first_flows_b
+
+    # Everything the device's XML is generated from, e.g. for content hashing
+    def astuple(self):
+        return (self.guid, self.name, self.device_type, repr(self.settings), self.ip_address_a, self.ip_address_b,
+                tuple(spigot.astuple() for spigot in self.source_spigots),
+                tuple(spigot.astuple() for spigot in self.destination_spigots),
+                tuple(flow.astuple() for flow in self.first_flows_a),
+                tuple(flow.astuple() for flow in self.first_flows_b))
+
+    def __reduce__(self):
+        return (Device, (self.guid, self.name, self.device_type, self.settings, self.ip_address_a, self.ip_address_b,
+                         self.source_spigots, self.destination_spigots, self.first_flows_a, self.first_flows_b))
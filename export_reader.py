@@ -0,0 +1,102 @@
+import importlib.util
+import logging
+import os
+import time
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+# Fast ingestion of IP Configurator export workbooks.
+#
+# Only the columns the builder uses are kept from the large sheets, and rows are filtered
+# by Device Type while the sheet is being read. calamine (python-calamine) is used when it
+# is installed; otherwise the workbook is streamed with openpyxl in read-only mode,
+# reading plain cell values instead of going through pandas' per-cell conversion.
+
+PROGRESS_ROWS = 5000  # Rows between progress reports while streaming a sheet
+
+SHEET_NAMES = ['Device Names', 'Source Ports', 'Destination Ports', 'Source Flows']
+
+# Columns read from each sheet, None keeps every column (Device Names is shown in the GUI)
+SHEET_COLUMNS = {
+    'Device Names': None,
+    'Source Ports': ['GUID', 'Device Type', 'Spigot Index'],
+    'Destination Ports': ['GUID', 'Device Type', 'Spigot Index'],
+    'Source Flows': ['GUID', 'Device Type', 'Interface', 'Flow Type', 'Spigot Index', 'Flow Enabled',
+                     'Multicast Address', 'Source Address', 'Dst RTP Port', 'Src RTP Port'],
+}
+
+# A single Device Type name or any collection of them, as a set
+def device_type_set(device_type):
+    return {device_type} if isinstance(device_type, str) else set(device_type)
+
+# Function to pick the fastest Excel engine available for a file
+def select_engine(filepath):
+    if not filepath.lower().endswith(('.xlsx', '.xlsm')):
+        return None  # Let pandas choose (e.g. xlrd for legacy .xls)
+    if importlib.util.find_spec('python_calamine') is not None:
+        return 'calamine'
+    return 'openpyxl'
+
+def column_filter(columns):
+    # Callable usecols so optional columns such as 'Src RTP Port' may be absent
+    if columns is None:
+        return None
+    return lambda name: name in columns
+
+# Function to read one sheet through pandas and filter it to a set of device types
+def read_sheet_pandas(filepath, sheet_name, columns, device_types, engine):
+    df = pd.read_excel(filepath, sheet_name=sheet_name, usecols=column_filter(columns), engine=engine)
+    return df[df['Device Type'].isin(device_types)]
+
+# Function to stream one sheet with openpyxl, keeping only matching rows and wanted columns
+def read_sheet_openpyxl(workbook, sheet_name, columns, device_types, progress=None):
+    worksheet = workbook[sheet_name]
+    total_rows = worksheet.max_row or 0  # From the sheet dimension, may be missing
+    rows = worksheet.iter_rows(values_only=True)
+    header = next(rows, ())
+    names = [name if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+    positions = [i for i, name in enumerate(names) if columns is None or name in columns]
+    type_position = names.index('Device Type')
+
+    records = [[names[i] for i in positions]]
+    for row_number, row in enumerate(rows, start=1):
+        if progress is not None and row_number % PROGRESS_ROWS == 0:
+            progress(f"Parsing {sheet_name}", row_number, max(total_rows, row_number))
+        if type_position < len(row) and row[type_position] in device_types:
+            records.append([row[i] if i < len(row) and row[i] is not None else '' for i in positions])
+
+    # Hand the kept rows to the same parser read_excel uses, so empty cells become NaN,
+    # 'TRUE'/'FALSE' strings become booleans and column dtypes match the pandas path
+    return TextParser(records, header=0).read()
+
+# Function to read the four export sheets for one or more device types, returns a dict keyed by sheet name
+# progress, if given, is called as progress(message, done, total) and may raise to abort the read
+def read_export_sheets(filepath, device_type, engine=None, progress=None):
+    start = time.perf_counter()
+    if engine is None:
+        engine = select_engine(filepath)
+    device_types = device_type_set(device_type)
+
+    sheets = {}
+    workbook = None
+    try:
+        if engine == 'openpyxl':
+            import openpyxl
+            workbook = openpyxl.load_workbook(filepath, read_only=True, data_only=True, keep_links=False)
+        for number, name in enumerate(SHEET_NAMES, start=1):
+            if workbook is not None:
+                sheets[name] = read_sheet_openpyxl(workbook, name, SHEET_COLUMNS[name], device_types, progress)
+            else:
+                sheets[name] = read_sheet_pandas(filepath, name, SHEET_COLUMNS[name], device_types, engine)
+            if progress is not None:
+                progress(f"Parsed {name} sheet", number, len(SHEET_NAMES))
+    finally:
+        if workbook is not None:
+            workbook.close()
+
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(filepath) / (1024 * 1024)
+    logging.info(f"Loaded {os.path.basename(filepath)} ({size_mb:.1f} MB) with {engine or 'pandas default'} engine in {elapsed:.2f}s: "
+                 + ", ".join(f"{name}={len(df)}" for name, df in sheets.items()))
+    return sheets
@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import time
+
+from export_reader import device_type_set, read_export_sheets
+
+# Opt-in binary snapshot of the parsed export sheets, kept in the user's cache directory.
+#
+# Parsing a large .xlsx takes far longer than everything else in a build, and the same
+# export is usually opened many times. After a workbook is parsed, the four filtered
+# DataFrames are pickled to a snapshot in the user's cache directory together with the
+# workbook's size, mtime and content hash. The next open loads the DataFrames straight
+# from the snapshot when the size and mtime still match, or when they differ but the
+# content hash is unchanged (e.g. the file was copied). Anything else re-parses the
+# workbook and replaces the snapshot.
+#
+# The file holds two pickles: a small header, checked first, then the sheets. Pickle
+# keeps the mixed-type object columns of an export exactly as parsed, which Arrow
+# formats such as Feather or Parquet can't, and needs no extra dependency. Loading a
+# pickle can run code, so snapshots are only ever kept in a per-user cache directory
+# (%LOCALAPPDATA% or $XDG_CACHE_HOME / ~/.cache), never beside the workbook where anyone
+# with access to a shared folder could plant one. On POSIX a snapshot is only loaded if
+# it and its directory belong to the user and no one else can write to them.
+#
+# Exports are usually named by date, so every new export would add a snapshot. Saving one
+# prunes the directory to the MAX_SNAPSHOTS most recently used, loading one counts as a use.
+
+SNAPSHOT_VERSION = 1  # Bump whenever the columns or parsing of the sheets change
+HASH_CHUNK_BYTES = 1024 * 1024
+CACHE_DIR_NAME = "DDSDummyDeviceBuilder"
+MAX_SNAPSHOTS = 20
+
+def default_snapshot_dir():
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, CACHE_DIR_NAME, "snapshots")
+
+# Default snapshot location in the user's cache, one per workbook path and set of device types
+def default_snapshot_path(xlsx_path, device_type):
+    source = os.path.abspath(xlsx_path)
+    key = hashlib.blake2b(os.path.normcase(source).encode(), digest_size=8).hexdigest()  # Same name in different folders
+    return os.path.join(default_snapshot_dir(), f"{os.path.basename(source)}.{key}.{'+'.join(sorted(device_type_set(device_type)))}.snapshot")
+
+# True if only the current user can have written path; Windows relies on the profile directory's ACLs
+def private_path(path):
+    if os.name != "posix":
+        return True
+    path_stat = os.stat(path)
+    return path_stat.st_uid == os.getuid() and not path_stat.st_mode & 0o022
+
+def file_digest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as source_file:
+        for chunk in iter(lambda: source_file.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Function to read the sheets from a snapshot, returns (sheets or None, workbook hash if it was computed)
+def load_snapshot(snapshot_path, xlsx_path, device_type, source_stat):
+    try:
+        if not (private_path(snapshot_path) and private_path(os.path.dirname(os.path.abspath(snapshot_path)))):
+            logging.warning(f"Ignoring export snapshot {snapshot_path}: it could have been written by another user")
+            return None, None
+        with open(snapshot_path, "rb") as snapshot_file:
+            header = pickle.load(snapshot_file)
+            if header.get("version") != SNAPSHOT_VERSION or header.get("device_types") != sorted(device_type_set(device_type)):
+                return None, None
+            if header["size"] != source_stat.st_size:
+                return None, None
+
+            digest = None
+            if header["mtime_ns"] != source_stat.st_mtime_ns:
+                # Same size but touched or copied, only the content decides
+                digest = file_digest(xlsx_path)
+                if header["hash"] != digest:
+                    return None, digest
+            sheets = pickle.load(snapshot_file)
+        os.utime(snapshot_path)  # Most recently used, for prune_snapshots
+        return sheets, digest
+    except FileNotFoundError:
+        return None, None
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError, TypeError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable export snapshot {snapshot_path}: {e}")
+        return None, None
+
+def save_snapshot(snapshot_path, device_type, source_stat, digest, sheets):
+    header = {"version": SNAPSHOT_VERSION, "device_types": sorted(device_type_set(device_type)), "size": source_stat.st_size,
+              "mtime_ns": source_stat.st_mtime_ns, "hash": digest}
+    temp_path = snapshot_path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(snapshot_path)), mode=0o700, exist_ok=True)
+        with open(temp_path, "wb") as snapshot_file:
+            pickle.dump(header, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(sheets, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, snapshot_path)
+    except OSError as e:
+        # e.g. a read-only share, the export still loads, just without a snapshot for next time
+        logging.warning(f"Could not save export snapshot {snapshot_path}: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return
+    logging.info(f"Export snapshot saved: {snapshot_path} ({os.path.getsize(snapshot_path) / (1024 * 1024):.1f} MB)")
+    prune_snapshots(os.path.dirname(os.path.abspath(snapshot_path)))
+
+# Function to delete all but the max_snapshots most recently used snapshots in directory
+def prune_snapshots(directory, max_snapshots=MAX_SNAPSHOTS):
+    try:
+        with os.scandir(directory) as entries:
+            snapshots = [(entry.stat().st_mtime_ns, entry.path) for entry in entries
+                         if entry.name.endswith(".snapshot") and entry.is_file()]
+        for _, path in sorted(snapshots, reverse=True)[max_snapshots:]:
+            os.remove(path)
+            logging.info(f"Removed least recently used export snapshot: {path}")
+    except OSError as e:
+        logging.warning(f"Could not prune export snapshots in {directory}: {e}")
+
+# Function to read the four export sheets for one or more device types, from the snapshot when it is current
+# Same arguments and result as export_reader.read_export_sheets
+def read_export_sheets_cached(filepath, device_type, engine=None, progress=None, snapshot_path=None):
+    start = time.perf_counter()
+    if snapshot_path is None:
+        snapshot_path = default_snapshot_path(filepath, device_type)
+
+    source_stat = os.stat(filepath)
+    sheets, digest = load_snapshot(snapshot_path, filepath, device_type, source_stat)
+    if sheets is not None:
+        if digest is not None:
+            save_snapshot(snapshot_path, device_type, source_stat, digest, sheets)  # Record the new mtime
+        logging.info(f"Loaded {os.path.basename(filepath)} from snapshot in {time.perf_counter() - start:.2f}s: "
+                     + ", ".join(f"{name}={len(df)}" for name, df in sheets.items()))
+        if progress is not None:
+            progress("Loaded export snapshot", 1, 1)
+        return sheets
+
+    # Hash before parsing, so a workbook saved during the parse can't be stored under the new content's hash
+    if digest is None:
+        digest = file_digest(filepath)
+    sheets = read_export_sheets(filepath, device_type, engine, progress)
+
+    current_stat = os.stat(filepath)
+    if (current_stat.st_size, current_stat.st_mtime_ns) == (source_stat.st_size, source_stat.st_mtime_ns):
+        save_snapshot(snapshot_path, device_type, source_stat, digest, sheets)
+    return sheets
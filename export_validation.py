@@ -0,0 +1,200 @@
+import json
+import logging
+
+import pandas as pd
+
+# Checks run on the parsed export sheets before the device model and XML are built.
+#
+# Values from Source Flows are copied into the XML as they are, so a clash between two
+# flows or a cell the builder can't convert used to show up only when a build crashed or
+# on the emulator side. validate_export_sheets() looks at every enabled flow once, using
+# hash lookups on (Multicast Address, Dst RTP Port) and (GUID, Spigot Index) instead of
+# comparing rows with each other, so the checks stay linear in the number of rows however
+# large the export is. The result is a ValidationReport with one entry per problem found:
+#
+#   error    invalid_spigot_index       Spigot Index of a port that is empty or not a whole number
+#            invalid_port               Dst/Src RTP Port that is not a whole number in 1-65535
+#            missing_port               enabled flow with an empty Dst RTP Port
+#   warning  invalid_spigot_index       the same for an enabled flow, which is then left out
+#            missing_address            enabled flow with an empty Multicast or Source Address, written as "nan"
+#            duplicate_multicast        (Multicast Address, Dst RTP Port) used by several enabled flows
+#            flows_without_source_port  enabled flows for a spigot index Source Ports doesn't list
+#   info     source_port_without_flows  Source Ports spigot without any enabled flow
+#
+# Errors always stop the build, since the builder can't convert those cells. Warnings only
+# stop it in strict mode.
+
+ERROR = "error"
+WARNING = "warning"
+INFO = "info"
+SEVERITIES = (ERROR, WARNING, INFO)
+
+LOGGED_EXAMPLES = 5  # Issues of each check quoted in the log, the JSON report has all of them
+MAX_PORT = 65535
+
+class ValidationReport:
+    def __init__(self):
+        self.issues = []  # One dictionary per problem, in the order found
+        self.rows = {}  # Sheet name -> rows checked
+
+    def add(self, check, severity, message, **details):
+        self.issues.append({'check': check, 'severity': severity, 'message': message, **details})
+
+    def count(self, severity):
+        return sum(1 for issue in self.issues if issue['severity'] == severity)
+
+    # True if the build should stop, strict also stops it on warnings
+    def failed(self, strict=False):
+        return any(issue['severity'] == ERROR or (strict and issue['severity'] == WARNING) for issue in self.issues)
+
+    def checks(self):
+        counts = {}
+        for issue in self.issues:
+            counts[issue['check']] = counts.get(issue['check'], 0) + 1
+        return counts
+
+    def to_dict(self):
+        return {
+            'rows': self.rows,
+            'totals': {severity: self.count(severity) for severity in SEVERITIES},
+            'checks': self.checks(),
+            'issues': self.issues,
+        }
+
+    # Function to format the counts and a few examples of each check as plain text
+    def summary(self, title):
+        lines = [title + " " + ", ".join(f"{self.count(severity)} {severity}s" for severity in SEVERITIES)]
+        for check, total in self.checks().items():
+            examples = [issue['message'] for issue in self.issues if issue['check'] == check][:LOGGED_EXAMPLES]
+            lines.append(f"  {check}: {total}")
+            lines.extend(f"    {message}" for message in examples)
+            if total > len(examples):
+                lines.append(f"    ... and {total - len(examples)} more")
+        return "\n".join(lines)
+
+    def log_summary(self, title):
+        if self.count(ERROR):
+            logging.error(self.summary(title))
+        elif self.count(WARNING):
+            logging.warning(self.summary(title))
+        else:
+            logging.info(self.summary(title))
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as json_file:
+            json.dump(self.to_dict(), json_file, indent=2, default=str)
+        logging.info(f"Validation report saved: {path}")
+
+# Raised by load_export when validation stops the build, the report has every issue found
+class ExportValidationError(ValueError):
+    def __init__(self, report):
+        super().__init__(f"Export failed validation with {report.count(ERROR)} errors and {report.count(WARNING)} warnings: "
+                         + "; ".join(f"{check}={total}" for check, total in report.checks().items()))
+        self.report = report
+
+# Function to convert a column to numbers, returns (numbers, mask of cells that are filled but not whole numbers)
+def whole_numbers(values, low=None, high=None):
+    numbers = pd.to_numeric(values, errors='coerce')
+    invalid = numbers.isna() | (numbers % 1 != 0)
+    if low is not None:
+        invalid |= numbers < low
+    if high is not None:
+        invalid |= numbers > high
+    return numbers, values.notna() & invalid
+
+# Empty cells read as NaN, which JSON can't hold
+def cell_value(value):
+    return None if pd.isna(value) else value
+
+def check_spigot_indexes(report, sheet_name, rows, severity=ERROR):
+    numbers, invalid = whole_numbers(rows['Spigot Index'])
+    invalid |= rows['Spigot Index'].isna()
+    for guid, value in zip(rows['GUID'][invalid].tolist(), rows['Spigot Index'][invalid].tolist()):
+        report.add('invalid_spigot_index', severity, f"{sheet_name}: {guid} has Spigot Index {cell_value(value)!r}",
+                   sheet=sheet_name, guid=guid, value=cell_value(value))
+    # (GUID, Spigot Index) of every valid row, for the cross-sheet check
+    return list(zip(rows['GUID'][~invalid].tolist(), numbers[~invalid].astype('int64').tolist()))
+
+def check_ports(report, flows):
+    ports = {}
+    for column in ('Dst RTP Port', 'Src RTP Port'):
+        if column not in flows:
+            continue
+        numbers, invalid = whole_numbers(flows[column], 1, MAX_PORT)
+        for guid, spigot_index, interface, value in zip(flows['GUID'][invalid].tolist(), flows['Spigot Index'][invalid].tolist(),
+                                                        flows['Interface'][invalid].tolist(), flows[column][invalid].tolist()):
+            report.add('invalid_port', ERROR, f"{guid} spigot {spigot_index} {interface}: {column} {value!r}",
+                       guid=guid, spigot_index=cell_value(spigot_index), interface=interface, column=column, value=value)
+        ports[column] = numbers.where(~invalid)
+
+    missing = flows['Dst RTP Port'].isna()
+    for guid, spigot_index, interface in zip(flows['GUID'][missing].tolist(), flows['Spigot Index'][missing].tolist(),
+                                             flows['Interface'][missing].tolist()):
+        report.add('missing_port', ERROR, f"{guid} spigot {spigot_index} {interface}: empty Dst RTP Port",
+                   guid=guid, spigot_index=cell_value(spigot_index), interface=interface)
+    return ports['Dst RTP Port']
+
+# Function to report enabled flows with an empty address, returns a mask of the flows with a Multicast Address
+def check_addresses(report, flows):
+    present = {}
+    for column in ('Multicast Address', 'Source Address'):
+        present[column] = flows[column].notna() & (flows[column].map(str).str.strip() != '')
+        missing = ~present[column]
+        for guid, spigot_index, interface in zip(flows['GUID'][missing].tolist(), flows['Spigot Index'][missing].tolist(),
+                                                 flows['Interface'][missing].tolist()):
+            report.add('missing_address', WARNING, f"{guid} spigot {spigot_index} {interface}: empty {column}",
+                       guid=guid, spigot_index=cell_value(spigot_index), interface=interface, column=column)
+    return present['Multicast Address']
+
+def check_duplicate_multicast(report, flows, dst_ports, has_address):
+    addresses = flows['Multicast Address'].map(str).str.strip()
+    usable = has_address & dst_ports.notna()
+    keys = pd.DataFrame({'address': addresses, 'port': dst_ports})
+    # Hash-based, so one pass finds the rows sharing a key, and only those are grouped in Python
+    shared = usable & keys.duplicated(keep=False)
+
+    groups = {}  # (Multicast Address, Dst RTP Port) -> flows using it
+    for guid, spigot_index, interface, address, port in zip(flows['GUID'][shared].tolist(), flows['Spigot Index'][shared].tolist(),
+                                                            flows['Interface'][shared].tolist(), addresses[shared].tolist(),
+                                                            dst_ports[shared].tolist()):
+        groups.setdefault((address, int(port)), []).append(
+            {'guid': guid, 'spigot_index': cell_value(spigot_index), 'interface': interface})
+
+    for (address, port), users in groups.items():
+        where = ", ".join(f"{user['guid']} spigot {user['spigot_index']} {user['interface']}" for user in users[:3])
+        more = f" and {len(users) - 3} more" if len(users) > 3 else ""
+        report.add('duplicate_multicast', WARNING, f"{address}:{port} used by {len(users)} flows: {where}{more}",
+                   mcast_address=address, dst_port=port, flows=users)
+
+def check_spigot_coverage(report, source_port_keys, flow_keys):
+    ports = set(source_port_keys)
+    flow_counts = {}
+    for key in flow_keys:
+        flow_counts[key] = flow_counts.get(key, 0) + 1
+
+    for (guid, spigot_index), count in flow_counts.items():
+        if (guid, spigot_index) not in ports:
+            report.add('flows_without_source_port', WARNING,
+                       f"{guid} has {count} enabled flows for spigot {spigot_index}, which Source Ports doesn't list",
+                       guid=guid, spigot_index=spigot_index, flows=count)
+    for guid, spigot_index in dict.fromkeys(source_port_keys):  # Once per spigot, in sheet order
+        if (guid, spigot_index) not in flow_counts:
+            report.add('source_port_without_flows', INFO, f"{guid} source spigot {spigot_index} has no enabled flows",
+                       guid=guid, spigot_index=spigot_index)
+
+# Function to run every check on the four export sheets, returns a ValidationReport
+def validate_export_sheets(sheets):
+    report = ValidationReport()
+    source_flows = sheets['Source Flows']
+    flows = source_flows[source_flows['Flow Enabled'] == True]
+    report.rows = {'Source Ports': len(sheets['Source Ports']), 'Destination Ports': len(sheets['Destination Ports']),
+                   'Source Flows': len(source_flows), 'enabled flows': len(flows)}
+
+    source_port_keys = check_spigot_indexes(report, 'Source Ports', sheets['Source Ports'])
+    check_spigot_indexes(report, 'Destination Ports', sheets['Destination Ports'])
+    flow_keys = check_spigot_indexes(report, 'Source Flows', flows, WARNING)  # Such flows match no spigot, the build still runs
+    dst_ports = check_ports(report, flows)
+    has_address = check_addresses(report, flows)
+    check_duplicate_multicast(report, flows, dst_ports, has_address)
+    check_spigot_coverage(report, source_port_keys, flow_keys)
+    return report
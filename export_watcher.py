@@ -0,0 +1,49 @@
+import logging
+import os
+import threading
+import time
+
+# Polling watcher for export workbooks, used by the builder's --watch mode.
+#
+# Each workbook's size and mtime are checked every POLL_SECONDS, which is cheap for a
+# handful of files and works the same on Windows network shares, where change
+# notifications are unreliable. A change is only reported once the file has stayed the
+# same for SETTLE_SECONDS, so a workbook that is still being saved is never read half
+# written. Excel's save-to-temp-and-rename shows up as one change.
+
+POLL_SECONDS = 0.2
+SETTLE_SECONDS = 0.4
+
+# (size, mtime) of a file, None while it is missing (e.g. between delete and rename during a save)
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+# Function to call on_change(path) whenever one of paths changes and then settles, until stop is set
+# on_change runs on the calling thread; changes made while it runs are picked up afterwards
+def watch_files(paths, on_change, poll_seconds=POLL_SECONDS, settle_seconds=SETTLE_SECONDS, stop=None):
+    if stop is None:
+        stop = threading.Event()
+    current = {path: file_signature(path) for path in paths}  # Signature of the last version handled
+    pending = {}  # path -> (new signature, time it was first seen)
+
+    while not stop.is_set():
+        now = time.monotonic()
+        for path in paths:
+            signature = file_signature(path)
+            if signature is None or signature == current[path]:
+                pending.pop(path, None)
+                continue
+
+            seen = pending.get(path)
+            if seen is None or seen[0] != signature:
+                pending[path] = (signature, now)  # Still changing, restart the settle time
+            elif now - seen[1] >= settle_seconds:
+                del pending[path]
+                current[path] = signature
+                logging.info(f"Change detected: {path}")
+                on_change(path)
+        stop.wait(poll_seconds)
@@ -1,5 +1,9 @@
+import atexit
+import collections
 import logging
+import logging.handlers
 import os
+import queue
 
 # Define custom colors using ANSI escape codes
 COLORS = {
@@ -11,6 +15,8 @@ COLORS = {
 }
 RESET = '\033[0m'  # Reset to default color
 
+LOG_FILENAME = 'DummyDeviceBuilder.log'
+
 # Custom formatter to add color to log messages
 class ColoredFormatter(logging.Formatter):
     def format(self, record):
@@ -19,35 +25,111 @@ class ColoredFormatter(logging.Formatter):
         color = COLORS.get(levelname, RESET)
         return f'{color}{message}{RESET}'
 
-def configure_logging():
+# Handler keeping the most recent formatted records in memory for the in-app log viewer
+class RingBufferHandler(logging.Handler):
+    def __init__(self, capacity=1000):
+        super().__init__()
+        self.entries = collections.deque(maxlen=capacity)  # (sequence, levelname, message)
+        self.sequence = 0
+
+    def emit(self, record):
+        try:
+            message = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        # Called with the handler lock held, so sequence and entries stay consistent
+        self.sequence += 1
+        self.entries.append((self.sequence, record.levelname, message))
+
+    def since(self, sequence):
+        # Entries newer than sequence, oldest first
+        self.acquire()
+        try:
+            if self.sequence <= sequence:
+                return []
+            return [entry for entry in self.entries if entry[0] > sequence]
+        finally:
+            self.release()
+
+# Ring buffer handler installed by configure_logging, None until then
+log_buffer = None
+log_listener = None
+
+# Log level used when none is given, override with the DDS_LOG_LEVEL environment variable
+DEFAULT_LOG_LEVEL = 'INFO'
+
+def resolve_level(level):
+    if level is None:
+        level = os.environ.get('DDS_LOG_LEVEL', DEFAULT_LOG_LEVEL)
+    if isinstance(level, str):
+        value = logging.getLevelName(level.upper())  # Unknown names come back as a string
+        return value if isinstance(value, int) else logging.INFO
+    return level
+
+def stop_logging():
+    # Flush queued records to the handlers and stop the listener thread
+    global log_listener
+    if log_listener is not None:
+        log_listener.stop()
+        log_listener = None
+
+# Configure the root logger. Records are put on a queue by the logging call and written to
+# the log file, the console and the in-memory viewer buffer by a background listener thread,
+# so file and console I/O stay off the hot path. Each destination has its own level
+# (level is the default for all three, DEBUG is opt-in).
+def configure_logging(level=None, file_level=None, console_level=None, viewer_level=None):
+    global log_buffer
+    level = resolve_level(level)
+    file_level = resolve_level(file_level) if file_level is not None else level
+    console_level = resolve_level(console_level) if console_level is not None else level
+    viewer_level = resolve_level(viewer_level) if viewer_level is not None else level
+
     # Create the root logger
     logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)  # Set the root logger level to DEBUG
+    # Records below every handler's level are dropped before any formatting happens
+    logger.setLevel(min(file_level, console_level, viewer_level))
 
     # Remove all previous handlers to avoid duplicate logs
+    stop_logging()
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
 
     # Clear log file content if it exists
-    log_filename = 'DummyDeviceBuilder.log'
+    log_filename = LOG_FILENAME
     if os.path.exists(log_filename):
         open(log_filename, 'w').close()
 
     # Configure logging to file with timestamped formatter
     file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     file_handler = logging.FileHandler(log_filename)
-    file_handler.setLevel(logging.DEBUG)
+    file_handler.setLevel(file_level)
     file_handler.setFormatter(file_formatter)
 
     # Configure logging to console with colored formatter
     console_formatter = ColoredFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.DEBUG)
+    console_handler.setLevel(console_level)
     console_handler.setFormatter(console_formatter)
 
-    # Add handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Keep recent records in memory for the GUI log viewer
+    log_buffer = RingBufferHandler()
+    log_buffer.setLevel(viewer_level)
+    log_buffer.setFormatter(file_formatter)
+
+    # The logger only enqueues records, the listener thread hands them to the real handlers
+    start_listener(logger, file_handler, console_handler, log_buffer)
+    return log_buffer
+
+def start_listener(logger, *handlers):
+    global log_listener
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    log_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    log_listener.start()
+
+# Make sure queued records reach the handlers before the interpreter exits
+atexit.register(stop_logging)
 
 if __name__ == '__main__':
     configure_logging()
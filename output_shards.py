@@ -0,0 +1,131 @@
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from export_snapshot import file_digest
+
+# Sharded DummyDevices output for estates too large for one file.
+#
+# Devices are cut, in output order, into shards of at most max_devices devices and/or
+# max_bytes bytes of UTF-8, written as <output stem>.part0001.xml, .part0002.xml, ...
+# Each shard is an ordinary DummyDevices file. A manifest at <output>.manifest.json lists
+# the shards in order with their device count, size, first and last GUID and a blake2b
+# checksum, so consumers can load (and verify) the shards in parallel.
+#
+# With more than one worker, finished shards are written and checksummed on a thread pool
+# while the next shard is being generated. Shards go to .tmp files first and are only
+# moved into place, followed by the manifest, once every shard is complete. Shards listed
+# in the previous manifest but not the new one are deleted.
+
+MANIFEST_VERSION = 1
+
+def default_manifest_path(xml_path):
+    return xml_path + ".manifest.json"
+
+# <output stem>.part<number><extension>, e.g. DummyDevices.part0001.xml
+def shard_path(xml_path, number):
+    stem, extension = os.path.splitext(xml_path)
+    return f"{stem}.part{number:04d}{extension or '.xml'}"
+
+# Function to write one shard to its .tmp file, returns its manifest entry
+def write_shard(path, fragments, first_guid, last_guid):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as xml_file:  # Same encoding as a single output file
+        xml_file.write('\n'.join(fragments))
+    return {'file': os.path.basename(path), 'devices': len(fragments), 'bytes': os.path.getsize(temp_path),
+            'first_guid': first_guid, 'last_guid': last_guid, 'blake2b': file_digest(temp_path)}
+
+def read_manifest(path):
+    try:
+        with open(path, "r", encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable shard manifest {path}: {e}")
+        return None
+
+class ShardWriter:
+    # replace(temp_path, path) moves a finished file into place, e.g. dds_builder.replace_file
+    def __init__(self, xml_path, max_devices=None, max_bytes=None, workers=1, replace=os.replace):
+        if not max_devices and not max_bytes:
+            raise ValueError("Sharded output needs a maximum device count or size per shard")
+        self.xml_path = xml_path
+        self.max_devices = max_devices
+        self.max_bytes = max_bytes
+        self.replace = replace
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        self.pending = []  # Manifest entries of the shards handed off, as futures when written on the pool
+        self.paths = []
+        self.fragments = []  # Devices of the shard being filled
+        self.guids = []
+        self.size = 0
+        self.devices = 0
+
+    def add(self, guid, fragment):
+        size = len(fragment.encode("utf-8"))  # As written, device names can be non-ASCII
+        # A device larger than max_bytes still gets a shard of its own
+        if self.fragments and ((self.max_devices and len(self.fragments) >= self.max_devices)
+                               or (self.max_bytes and self.size + 1 + size > self.max_bytes)):
+            self.flush()
+        self.size += size + (1 if self.fragments else 0)  # Devices are separated by a newline
+        self.fragments.append(fragment)
+        self.guids.append(guid)
+        self.devices += 1
+
+    def flush(self):
+        if not self.fragments:
+            return
+        path = shard_path(self.xml_path, len(self.paths) + 1)
+        self.paths.append(path)
+        arguments = (path, self.fragments, self.guids[0], self.guids[-1])
+        if self.executor is None:
+            self.pending.append(write_shard(*arguments))
+        else:
+            # Keep at most one shard per thread waiting, so memory stays bounded when writing is the bottleneck
+            busy = [future for future in self.pending if not future.done()]
+            if len(busy) >= self.workers:
+                busy[0].result()
+            self.pending.append(self.executor.submit(write_shard, *arguments))
+        self.fragments, self.guids, self.size = [], [], 0
+
+    # Function to finish the last shard, move every shard into place and write the manifest, returns the manifest
+    def close(self):
+        self.flush()
+        shards = self.pending if self.executor is None else [future.result() for future in self.pending]
+        self.shutdown()
+        for path in self.paths:
+            self.replace(path + ".tmp", path)
+
+        manifest_path = default_manifest_path(self.xml_path)
+        previous = read_manifest(manifest_path)
+        manifest = {'version': MANIFEST_VERSION, 'devices': self.devices, 'max_devices': self.max_devices,
+                    'max_bytes': self.max_bytes, 'shards': shards}
+        temp_path = manifest_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+        self.replace(temp_path, manifest_path)
+
+        # Shards of a previous, larger build would otherwise look like part of this one
+        if previous is not None:
+            current = {shard['file'] for shard in shards}
+            directory = os.path.dirname(self.xml_path)
+            for shard in previous.get('shards', []):
+                if shard.get('file') not in current and os.path.exists(os.path.join(directory, shard['file'])):
+                    os.remove(os.path.join(directory, shard['file']))
+
+        logging.info(f"Shard manifest saved: {manifest_path} ({len(shards)} shards, {self.devices} devices)")
+        return manifest
+
+    # Function to stop after an error or cancel, leaving the previous shards as they were
+    def abort(self):
+        self.shutdown()
+        for path in self.paths:
+            if os.path.exists(path + ".tmp"):
+                os.remove(path + ".tmp")
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
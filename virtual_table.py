@@ -0,0 +1,185 @@
+import tkinter as tk
+from tkinter import ttk
+
+import pandas as pd
+
+# Virtualized table for large DataFrames.
+#
+# A plain ttk.Treeview needs one item per row, which freezes the UI for seconds with tens
+# of thousands of devices. VirtualTable keeps only as many Treeview items as fit on screen
+# and rewrites their values as the user scrolls. Rows are sliced from the DataFrame a page
+# at a time (visible rows plus a buffer), and sorting and filtering work on the DataFrame,
+# never on the widget. Since the items stay put while rows move through them, the selection
+# is kept as the selected row's DataFrame index label and re-applied to whichever item
+# shows that row, if any.
+
+SORT_MARKERS = {True: " ▲", False: " ▼"}
+
+class VirtualTable:
+    def __init__(self, parent, buffer_rows=100):
+        self.buffer_rows = buffer_rows
+        self.dataframe = None  # Full table as loaded
+        self.view = None  # Filtered and sorted table being shown
+        self.top = 0  # Position in the view of the first visible row
+        self.visible_rows = 1
+        self.row_height = 20
+        self.sort_column = None
+        self.sort_ascending = True
+        self.filter_text = ""
+        self.page_start = 0
+        self.page_rows = []  # Cached slice of the view starting at page_start
+        self.item_labels = []  # DataFrame index label of the row each Treeview item shows
+        self.selected = None  # DataFrame index label of the selected row
+
+        self.tree = ttk.Treeview(parent, show="headings", selectmode="browse")
+        self.tree.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+
+        # The scrollbar tracks the position in the DataFrame, not the Treeview's own items
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)  # Windows and macOS
+        self.tree.bind("<Button-4>", lambda event: self.scroll_to(self.top - 3) or "break")  # X11 wheel up
+        self.tree.bind("<Button-5>", lambda event: self.scroll_to(self.top + 3) or "break")  # X11 wheel down
+        self.tree.bind("<Prior>", lambda event: self.scroll_to(self.top - self.visible_rows) or "break")
+        self.tree.bind("<Next>", lambda event: self.scroll_to(self.top + self.visible_rows) or "break")
+
+    def set_data(self, dataframe):
+        self.dataframe = dataframe
+        self.sort_column = None
+        self.sort_ascending = True
+        self.selected = None
+
+        self.tree["columns"] = list(dataframe.columns)
+        for column in dataframe.columns:
+            self.tree.heading(column, text=column, command=lambda c=column: self.sort_by(c))
+        self.apply_view()
+
+    def clear(self):
+        self.dataframe = None
+        self.view = None
+        self.item_labels = []
+        self.selected = None
+        self.tree.delete(*self.tree.get_children())
+        self.tree["columns"] = []
+        self.scrollbar.set(0.0, 1.0)
+
+    def row_count(self):
+        return 0 if self.view is None else len(self.view)
+
+    def set_filter(self, text):
+        self.filter_text = text.strip()
+        self.apply_view()
+
+    def sort_by(self, column):
+        if self.sort_column == column:
+            self.sort_ascending = not self.sort_ascending
+        else:
+            self.sort_column = column
+            self.sort_ascending = True
+        for name in self.tree["columns"]:
+            marker = SORT_MARKERS[self.sort_ascending] if name == self.sort_column else ""
+            self.tree.heading(name, text=name + marker)
+        self.apply_view()
+
+    # Function to rebuild the view from the DataFrame after a filter or sort change
+    def apply_view(self):
+        if self.dataframe is None:
+            return
+        view = self.dataframe
+
+        if self.filter_text:
+            # Case-insensitive substring match on any column
+            needle = self.filter_text.lower()
+            mask = pd.Series(False, index=view.index)
+            for column in view.columns:
+                mask |= view[column].astype(str).str.lower().str.contains(needle, regex=False)
+            view = view[mask]
+
+        if self.sort_column is not None:
+            try:
+                view = view.sort_values(self.sort_column, ascending=self.sort_ascending, kind="mergesort")
+            except TypeError:
+                # Mixed numbers and empty strings, fall back to comparing text
+                view = view.sort_values(self.sort_column, ascending=self.sort_ascending, kind="mergesort",
+                                        key=lambda values: values.astype(str))
+
+        self.view = view
+        self.page_rows = []
+        self.scroll_to(0)
+
+    def rows(self, start, count):
+        # Serve rows from the cached page, slicing a new page from the DataFrame only when needed
+        end = min(start + count, len(self.view))
+        if start < self.page_start or end > self.page_start + len(self.page_rows):
+            self.page_start = max(0, start - self.buffer_rows)
+            page_end = min(len(self.view), end + self.buffer_rows)
+            self.page_rows = self.view.iloc[self.page_start:page_end].to_numpy().tolist()
+        return self.page_rows[start - self.page_start:end - self.page_start]
+
+    def scroll_to(self, top):
+        total = self.row_count()
+        self.top = max(0, min(top, total - self.visible_rows))
+        self.refresh()
+
+    # Function to show the rows at the current position, reusing the existing Treeview items
+    def refresh(self):
+        total = self.row_count()
+        rows = self.rows(self.top, self.visible_rows) if total else []
+
+        items = self.tree.get_children()
+        for iid, values in zip(items, rows):
+            self.tree.item(iid, values=values)
+        for values in rows[len(items):]:
+            self.tree.insert("", "end", values=values)
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+
+        # Keep the highlight on the selected row, not on the item it was shown in
+        items = self.tree.get_children()
+        self.item_labels = self.view.index[self.top:self.top + len(rows)].tolist() if total else []
+        if self.selected in self.item_labels:
+            self.tree.selection_set(items[self.item_labels.index(self.selected)])
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == tk.MOVETO:
+            self.scroll_to(int(float(amount) * self.row_count()))
+        elif action == tk.SCROLL:
+            step = self.visible_rows if unit == tk.PAGES else 1
+            self.scroll_to(self.top + int(amount) * step)
+
+    def on_select(self, event):
+        # Only user clicks change the selected row, an empty selection means it scrolled out of view
+        selection = self.tree.selection()
+        if selection and self.tree.index(selection[0]) < len(self.item_labels):
+            self.selected = self.item_labels[self.tree.index(selection[0])]
+
+    def on_mousewheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small values such as ±1
+        notches = int(event.delta / 120)
+        if notches == 0 and event.delta:
+            notches = event.delta // abs(event.delta)
+        self.scroll_to(self.top - notches * 3)
+        return "break"
+
+    def on_resize(self, event):
+        # Measure a real row when there is one, the heading sits above the first row
+        items = self.tree.get_children()
+        heading_height = self.row_height + 4
+        if items:
+            bbox = self.tree.bbox(items[0])
+            if bbox:
+                heading_height, self.row_height = bbox[1], bbox[3]
+        visible_rows = max(1, (event.height - heading_height) // max(1, self.row_height))
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.scroll_to(self.top)